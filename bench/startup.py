@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+LIB = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lib')
+
+CASES = [
+    ('import webhdfs', 'import webhdfs'),
+    ('import webhdfs.prompt', 'import webhdfs.prompt'),
+    ('construct client', 'import webhdfs; webhdfs.WebHDFSClient(%r, "bench", conf=%r)'),
+]
+
+def run(code, count):
+    env = dict(os.environ, PYTHONPATH=LIB)
+    best = None
+    for i in range(count):
+        t = time.perf_counter()
+        subprocess.check_call([sys.executable, '-c', code], env=env)
+        d = time.perf_counter() - t
+        best = d if best is None else min(best, d)
+    return best
+
+def main():
+    p = argparse.ArgumentParser(description='measure webhdfs startup time')
+    p.add_argument('-n', '--count', type=int, default=10, help='runs per case, best is reported')
+    p.add_argument('-b', '--base', default='hdfs://localhost', help='client base url')
+    p.add_argument('-c', '--conf', default=None, help='hadoop conf dir')
+    args = p.parse_args()
+
+    base = run('pass', args.count)
+    print('%-24s %8.1f ms' % ('interpreter', base * 1000))
+    for name, code in CASES:
+        if '%r' in code:
+            code = code % (args.base, args.conf)
+        d = run(code, args.count)
+        print('%-24s %8.1f ms  (+%.1f ms)' % (name, d * 1000, (d - base) * 1000))
+
+if __name__ == '__main__':
+    main()
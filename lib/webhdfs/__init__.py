@@ -1,5 +1,6 @@
 from .errors import WebHDFSError
 from .client import WebHDFSClient
+from .attrib import WebHDFSListing
 from .attrib import WebHDFSObject
 
 __version__ = '2.0.0'
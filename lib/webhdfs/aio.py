@@ -0,0 +1,409 @@
+import aiohttp
+import asyncio
+import datetime
+import fnmatch
+import functools
+import json
+import logging
+import os
+import time
+import urllib.parse
+
+from .attrib import WebHDFSObject
+from .client import WebHDFSClient
+from .client import _Chunks
+from .client import _RangeWriter
+from .client import _summary
+from .errors import WebHDFSError
+from .errors import WebHDFSAlreadyBeingCreatedError
+from .errors import WebHDFSConnectionError
+from .errors import WebHDFSFileNotFoundError
+from .errors import WebHDFSIllegalArgumentError
+from .errors import WebHDFSIncompleteTransferError
+from .errors import WebHDFSRecoveryInProgressError
+from .metrics import Metrics
+
+LOG = logging.getLogger()
+
+class _BytesWriter(object):
+    def __init__(self):
+        self.bits = []
+        self.size = 0
+
+    def tell(self):
+        return self.size
+
+    def write(self, bits):
+        self.bits.append(bits)
+        self.size += len(bits)
+
+class AsyncWebHDFSClient(object):
+    def __init__(self, base, user, conf=None, wait=None, retry=None, pool=100, expect=1048576):
+        self.user = user
+        self.wait = wait or 0.5
+        self.retry = 3 if retry is None else retry
+        self.pool = pool
+        self.expect = expect
+        self.http = None
+        self.metrics = Metrics()
+        self._cnt = 0
+        self._cfg(base, conf)
+
+    _url = WebHDFSClient._url
+    _cfg = WebHDFSClient._cfg
+    _parse = WebHDFSClient._parse
+    _fix = WebHDFSClient._fix
+    _checkpoint = WebHDFSClient._checkpoint
+    _prealloc = WebHDFSClient._prealloc
+    _rewind = WebHDFSClient._rewind
+    calls = WebHDFSClient.calls
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        if self.http:
+            await self.http.close()
+            self.http = None
+
+    def _session(self):
+        if not self.http:
+            self.http = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool), timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.wait, sock_read=self.wait))
+
+        return self.http
+
+    def _log(self, rsp):
+        if not LOG.isEnabledFor(logging.DEBUG):
+            return
+
+        LOG.debug('url:  %s', rsp.url)
+        LOG.debug('code: %d %s', rsp.status, rsp.reason)
+
+        w = functools.reduce(lambda x, y: max(x, len(y)), rsp.headers.keys(), 0)
+        for k, v in sorted(rsp.headers.items()):
+            LOG.debug('  %%-%ds : %%s' % w, k, v)
+
+    async def _chk(self, rsp, path, info):
+        self._log(rsp)
+        self._cnt += 1
+        info['code'] = rsp.status
+
+        if rsp.status < 400:
+            return True
+
+        try:
+            e = json.loads(await rsp.read())
+            info['error'] = e['RemoteException']['exception']
+            if info['error'] == 'StandbyException':
+                self.metrics.bump('standby', 'failovers')
+                return False
+            raise WebHDFSError(e)
+        except ValueError:
+            info['error'] = rsp.reason
+            raise WebHDFSError('%s: %s' % (rsp.reason, path))
+
+    async def _send(self, c):
+        if hasattr(c.data, '__aiter__'):
+            async for i in c.data:
+                i = bytes(i, 'utf8') if isinstance(i, str) else i
+                c.sent += len(i)
+                yield i
+        elif hasattr(c.data, 'read') or hasattr(c.data, 'recv'):
+            l = asyncio.get_running_loop()
+            i = iter(c)
+            while True:
+                b = await l.run_in_executor(None, next, i, None)
+                if b is None:
+                    break
+                yield b
+        else:
+            for b in c:
+                yield bytes(b)
+
+    async def _req(self, name, path, kind='get', data=None, **args):
+        args['op']        = name
+        args['user.name'] = self.user
+
+        http = self._session()
+        try:
+            for base in list(self.urls):
+                u = '%s/webhdfs/v1/%s' % (base, urllib.parse.quote(path.lstrip('/')))
+                info = {'url': base, 'code': 0, 'sent': 0, 'recv': 0, 'redirect': 0.0, 'error': None}
+                t = self.metrics.start(name, path, info)
+                try:
+                    if not data:
+                        async with http.request(kind, u, params=args) as r:
+                            if not await self._chk(r, path, info):
+                                continue
+                            b = await r.read()
+                            info['recv'] = len(b)
+                            return json.loads(b) if len(b) else ''
+                    elif kind in ('put', 'post'):
+                        async with http.request(kind, u, params=dict(args, noredirect='true'), allow_redirects=False) as r:
+                            if not await self._chk(r, path, info):
+                                continue
+                            l = r.headers['location'] if r.status in (301, 302, 303, 307, 308) else json.loads(await r.read())['Location']
+                        x = self.expect is not None and (data.length is None or data.length > self.expect)
+                        info['redirect'] = time.monotonic() - t
+                        try:
+                            s = data.sent
+                            async with http.request(kind, l, headers={'content-type': 'application/octet-stream'}, data=self._send(data), expect100=x, timeout=aiohttp.ClientTimeout(total=None, sock_connect=self.wait)) as r:
+                                await self._chk(r, path, info)
+                        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                            info['error'] = type(e).__name__
+                            raise WebHDFSIncompleteTransferError('%s: transfer interrupted: %s' % (path, e))
+                        finally:
+                            info['sent'] = data.sent - s
+                        return True
+                    else:
+                        l = None if isinstance(data, _BytesWriter) else asyncio.get_running_loop()
+                        async with http.get(u, params=args) as r:
+                            if not await self._chk(r, path, info):
+                                continue
+                            try:
+                                async for c in r.content.iter_chunked(16 * 1024):
+                                    info['recv'] += len(c)
+                                    if l:
+                                        await l.run_in_executor(None, data.write, c)
+                                    else:
+                                        data.write(c)
+                            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                                info['error'] = type(e).__name__
+                                raise WebHDFSIncompleteTransferError('%s: transfer interrupted: %s' % (path, e))
+                        return True
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    info['error'] = type(e).__name__
+                    self.metrics.bump('failovers')
+                    continue
+                finally:
+                    self.metrics.done(name, path, t, info)
+            else:
+                raise WebHDFSConnectionError('cannot connect to any webhdfs endpoint')
+        finally:
+            if base in self.urls:
+                indx = self.urls.index(base)
+                self.urls = self.urls[indx:] + self.urls[:indx]
+
+    async def _backoff(self, path, tries, e):
+        LOG.debug('%s: attempt %d failed, retrying: %s', path, tries + 1, e)
+        await asyncio.sleep(self.wait * (tries + 1))
+
+    async def stat(self, path, catch=False):
+        try:
+            r = await self._req('GETFILESTATUS', path)
+            return WebHDFSObject(path, r['FileStatus'])
+        except WebHDFSFileNotFoundError as e:
+            if not catch:
+                raise e
+
+        return False
+
+    async def ls(self, path, recurse=False, request=False):
+        p = self._fix(path)
+        r = await self._req('LISTSTATUS', p)
+        for i in r['FileStatuses']['FileStatus']:
+            o = WebHDFSObject(p, i)
+            if not callable(request) or request(o):
+                yield o
+                if recurse and o.is_dir():
+                    async for o in self.ls('%s/%s' % (p, o.name), recurse, request):
+                        yield o
+
+    async def glob(self, path):
+        l = ['']
+        p = self._fix(path)
+        c = p.lstrip('/').split('/')
+        for i, n in enumerate(c):
+            d = []
+            for t, r in zip(l, await asyncio.gather(*[self._req('LISTSTATUS', t) for t in l])):
+                for f in r['FileStatuses']['FileStatus']:
+                    if fnmatch.fnmatch(f['pathSuffix'], n):
+                        if i == len(c) - 1:
+                            d.append(WebHDFSObject(t, f))
+                        elif f['type'] == 'DIRECTORY':
+                            d.append('%s/%s' % (t, f['pathSuffix']))
+            l = d
+
+        if not l:
+            raise WebHDFSFileNotFoundError('%s: no matching file or directory' % p)
+
+        return l
+
+    async def du(self, path, real=False):
+        p = self._fix(path)
+        r = (await self._req('GETCONTENTSUMMARY', p))['ContentSummary']
+        return _summary(r, real)
+
+    async def mkdir(self, path):
+        p = self._fix(path)
+        r = await self._req('MKDIRS', p, 'put')
+        return r['boolean']
+
+    async def mv(self, path, dest):
+        p = self._fix(path)
+        d = self._fix(dest)
+        r = await self._req('RENAME', p, 'put', destination=d)
+        return r['boolean']
+
+    async def rm(self, path, recurse=False):
+        p = self._fix(path)
+        r = await self._req('DELETE', p, 'delete', recursive='true' if recurse else 'false')
+        return r['boolean']
+
+    async def repl(self, path, num):
+        p = self._fix(path)
+        r = await self._req('SETREPLICATION', p, 'put', replication=num)
+        return r['boolean']
+
+    async def chown(self, path, owner='', group=''):
+        p = self._fix(path)
+        r = await self._req('SETOWNER', p, 'put', owner=owner, group=group)
+        return True
+
+    async def chmod(self, path, perm):
+        p = self._fix(path)
+        r = await self._req('SETPERMISSION', p, 'put', permission='%o' % perm if isinstance(perm, int) else perm)
+        return True
+
+    async def touch(self, path, time=None):
+        p = self._fix(path)
+        d = datetime.datetime.now()
+        if isinstance(time, datetime.datetime):
+            d = time
+        elif isinstance(time, int):
+            d = datetime.datetime.fromtimestamp(time)
+        elif time is not None:
+            raise WebHDFSIllegalArgumentError('\'%s\' is an invalid time argument' % time)
+        if not await self.stat(p, True):
+            await self.put(p, '')
+        r = await self._req('SETTIMES', p, 'put', modificationtime=d.strftime('%s000'))
+        return True
+
+    async def _get_range(self, path, data, offset, length, ckpt=None, sem=None):
+        w = _RangeWriter(data.fileno(), offset)
+        async with sem:
+            for i in range(self.retry + 1):
+                try:
+                    await self._req('OPEN', path, 'get', data=w, offset=w.offset, length=offset + length - w.offset)
+                    break
+                except (WebHDFSIncompleteTransferError, WebHDFSConnectionError) as e:
+                    if i == self.retry:
+                        raise e
+                    await self._backoff(path, i, e)
+
+        if ckpt:
+            await asyncio.get_running_loop().run_in_executor(None, ckpt.mark, offset, length)
+
+    async def _get_ranges(self, path, data, size, workers, chunk, ckpt=None):
+        done = await asyncio.get_running_loop().run_in_executor(None, self._prealloc, path, data, size, ckpt)
+        sem = asyncio.Semaphore(workers)
+        jobs = [asyncio.ensure_future(self._get_range(path, data, o, min(chunk, size - o), ckpt, sem)) for o in range(0, size, chunk) if (o, min(chunk, size - o)) not in done]
+        LOG.debug('%s: fetching %d ranges with %d workers', path, len(jobs), workers)
+
+        try:
+            await asyncio.gather(*jobs)
+        except Exception as e:
+            for j in jobs:
+                j.cancel()
+            raise e
+
+    async def _get_stream(self, path, data, base):
+        for i in range(self.retry + 1):
+            try:
+                await self._req('OPEN', path, 'get', data=data, offset=data.tell() - base)
+                break
+            except (WebHDFSIncompleteTransferError, WebHDFSConnectionError) as e:
+                if i == self.retry:
+                    raise e
+                await self._backoff(path, i, e)
+
+    async def get(self, path, data=None, workers=1, chunk=64 * 1024 * 1024, resume=False):
+        p = self._fix(path)
+        o = await self.stat(p)
+
+        if not data:
+            w = _BytesWriter()
+            await self._get_stream(p, w, 0)
+
+            rval = b''.join(w.bits)
+            if len(rval) != o.size:
+                raise WebHDFSIncompleteTransferError('%s: download incomplete' % p)
+            return rval
+
+        k = self._checkpoint(data, resume, path=p, size=o.size, date=o.bits['modificationTime'])
+        if k and not k.seen:
+            data.seek(0)
+            data.truncate()
+        if k:
+            k.save()
+
+        if workers > 1 and o.size > chunk:
+            await self._get_ranges(p, data, o.size, workers, chunk, k)
+        else:
+            base = data.tell()
+            if k:
+                base = 0
+                data.seek(0, os.SEEK_END)
+            await self._get_stream(p, data, base)
+
+        data.flush()
+        if os.fstat(data.fileno()).st_size != o.size:
+            raise WebHDFSIncompleteTransferError('%s: download incomplete' % p)
+
+        if k:
+            k.clear()
+
+        data.close()
+        return True
+
+    async def put(self, path, data, resume=False):
+        if isinstance(data, str):
+            data = bytes(data, 'utf8')
+
+        p = self._fix(path)
+        o = False
+        b = data.tell() if hasattr(data, 'seekable') and data.seekable() else 0
+        d = data
+
+        k = None
+        if resume:
+            if not hasattr(data, 'fileno'):
+                raise WebHDFSIllegalArgumentError('cannot resume transfer without a named local file')
+            s = os.fstat(data.fileno())
+            k = self._checkpoint(data, resume, path=p, size=s.st_size - b, date=int(s.st_mtime * 1000))
+            if k.seen:
+                o = await self.stat(p, catch=True)
+                d = self._rewind(data, b, o.size) if o else data
+            k.save()
+
+        for i in range(self.retry + 1):
+            c = _Chunks(d)
+            try:
+                if o:
+                    await self._req('APPEND', p, 'post', data=c)
+                else:
+                    await self._req('CREATE', p, 'put', data=c)
+                break
+            except (WebHDFSIncompleteTransferError, WebHDFSConnectionError, WebHDFSAlreadyBeingCreatedError, WebHDFSRecoveryInProgressError) as e:
+                if i == self.retry:
+                    raise e
+                o = await self.stat(p, catch=True)
+                d = self._rewind(data, b, o.size if o else 0)
+                if d is None:
+                    raise e
+                await self._backoff(p, i, e)
+
+        n = (o.size if o else 0) + c.sent
+        LOG.debug('%s: streamed %d bytes', p, n)
+        if n != (await self.stat(p)).size:
+            raise WebHDFSIncompleteTransferError('%s: upload incomplete' % p)
+
+        if k:
+            k.clear()
+
+        if hasattr(data, 'read'):
+            data.close()
+        return True
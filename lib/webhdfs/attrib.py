@@ -1,3 +1,4 @@
+import array
 import datetime
 import grp
 import os
@@ -44,20 +45,17 @@ def fix_encoding(bits):
 
 
 class WebHDFSObject(object):
+    __slots__ = ('path', '_name', '_bits', '_date', '_mode')
+
     def __init__(self, path, bits):
         self.path = path.rstrip('/')
-        self.bits = bits
+        self._name = bits['pathSuffix']
+        self._bits = bits
 
-        if not self.bits['pathSuffix']:
-            self.bits['pathSuffix'] = os.path.basename(self.path)
+        if not self._name:
+            self._name = os.path.basename(self.path)
             self.path = os.path.dirname(fix_encoding(self.path)).rstrip('/')
-
-        self.calc = {
-            'date': datetime.datetime.fromtimestamp(self.bits['modificationTime'] / 1000),
-            'perm': int(self.bits['permission'], 8) | (stat.S_IFDIR if self.is_dir() else stat.S_IFREG),
-        }
-        self.calc['mode'] = perm_to_mode(self.calc['perm'])
-
+            self._bits = dict(bits, pathSuffix=self._name)
 
     def __getstate__(self):
         return {'path': self.path, 'bits': self.bits}
@@ -75,45 +73,170 @@ class WebHDFSObject(object):
         return self.kind == 'DIRECTORY'
 
     def is_empty(self):
-        return self.is_dir() and self.bits['childrenNum'] == 0 or not self.is_dir() and self.size == 0
+        return self.is_dir() and self._bits.get('childrenNum', 0) == 0 or not self.is_dir() and self.size == 0
+
+    @property
+    def bits(self):
+        return self._bits
 
     @property
     def owner(self):
-        return fix_encoding(self.bits['owner'])
+        return fix_encoding(self._bits['owner'])
     @property
     def group(self):
-        return fix_encoding(self.bits['group'])
+        return fix_encoding(self._bits['group'])
 
     @property
     def name(self):
-        return fix_encoding(self.bits['pathSuffix'])
+        return fix_encoding(self._name)
     @property
     def full(self):
         return '%s/%s' % (self.path, self.name)
 
     @property
     def size(self):
-        return self.bits['length']
+        return self._bits['length']
 
     @property
     def repl(self):
-        return self.bits['replication']
+        return self._bits['replication']
 
     @property
     def kind(self):
-        return fix_encoding(self.bits['type'])
+        return fix_encoding(self._bits['type'])
+
+    @property
+    def time(self):
+        return self._bits['modificationTime']
 
     @property
     def date(self):
-        return self.calc['date']
+        try:
+            return self._date
+        except AttributeError:
+            self._date = datetime.datetime.fromtimestamp(self._bits['modificationTime'] / 1000)
+            return self._date
 
     @property
     def mode(self):
-        return self.calc['mode']
+        try:
+            return self._mode
+        except AttributeError:
+            self._mode = perm_to_mode(self.perm)
+            return self._mode
 
     @property
     def perm(self):
-        return self.calc['perm']
+        return int(self._bits['permission'], 8) | (stat.S_IFDIR if self.is_dir() else stat.S_IFREG)
+
+
+class WebHDFSListing(object):
+    _cols = ('pathSuffix', 'type', 'length', 'replication', 'permission', 'modificationTime', 'childrenNum', 'owner', 'group')
+    _opts = (('accessTime', '_atime'), ('blockSize', '_block'), ('fileId', '_inode'), ('storagePolicy', '_store'))
+
+    def __init__(self, rows=()):
+        self._path = []
+        self._name = []
+        self._kind = array.array('I')
+        self._size = array.array('q')
+        self._repl = array.array('h')
+        self._mask = array.array('H')
+        self._time = array.array('q')
+        self._kids = array.array('q')
+        self._user = array.array('I')
+        self._team = array.array('I')
+        self._atime = array.array('q')
+        self._block = array.array('q')
+        self._inode = array.array('q')
+        self._store = array.array('q')
+        self._more = []
+        self._dirs = {}
+        self._strs = {}
+        self._keys = []
+
+        for path, bits in rows:
+            self.append(path, bits)
+
+    def _intern(self, text):
+        if text not in self._strs:
+            self._strs[text] = len(self._keys)
+            self._keys.append(text)
+        return self._strs[text]
+
+    def append(self, path, bits):
+        path = path.rstrip('/')
+        name = bits['pathSuffix']
+
+        if not name:
+            name = os.path.basename(path)
+            path = os.path.dirname(fix_encoding(path)).rstrip('/')
+
+        self._path.append(self._dirs.setdefault(path, path))
+        self._name.append(name)
+        self._kind.append(self._intern(bits['type']))
+        self._size.append(bits['length'])
+        self._repl.append(bits['replication'])
+        self._mask.append(int(bits['permission'], 8))
+        self._time.append(bits['modificationTime'])
+        self._kids.append(bits.get('childrenNum', 0))
+        self._user.append(self._intern(bits['owner']))
+        self._team.append(self._intern(bits['group']))
+
+        more = {k: v for k, v in bits.items() if k not in self._cols}
+        for k, a in self._opts:
+            v = more.get(k)
+            if isinstance(v, int) and 0 <= v < 1 << 63:
+                del more[k]
+            else:
+                v = -1
+            getattr(self, a).append(v)
+        self._more.append(more or None)
+
+    def __len__(self):
+        return len(self._name)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, indx):
+        if isinstance(indx, slice):
+            return [self[i] for i in range(*indx.indices(len(self)))]
+
+        bits = {
+            'pathSuffix': self._name[indx],
+            'type': self._keys[self._kind[indx]],
+            'length': self._size[indx],
+            'replication': self._repl[indx],
+            'owner': self._keys[self._user[indx]],
+            'group': self._keys[self._team[indx]],
+            'permission': '%o' % self._mask[indx],
+            'modificationTime': self._time[indx],
+            'childrenNum': self._kids[indx],
+        }
+        for k, a in self._opts:
+            if getattr(self, a)[indx] >= 0:
+                bits[k] = getattr(self, a)[indx]
+        if self._more[indx]:
+            bits.update(self._more[indx])
+
+        return WebHDFSObject(self._path[indx], bits)
+
+    @property
+    def names(self):
+        return self._name
+
+    @property
+    def sizes(self):
+        return self._size
+
+    @property
+    def times(self):
+        return self._time
+
+    @property
+    def perms(self):
+        return self._mask
 
 
 class LocalFSObject(object):
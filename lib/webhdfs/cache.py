@@ -0,0 +1,44 @@
+import collections
+import threading
+import time
+
+def _related(a, b):
+    return a == b or a.startswith(b.rstrip('/') + '/') or b.startswith(a.rstrip('/') + '/')
+
+class Cache(object):
+    def __init__(self, size, ttl):
+        self.size = size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._map = collections.OrderedDict()
+        self._lck = threading.Lock()
+
+    def get(self, key):
+        with self._lck:
+            item = self._map.get(key)
+            if item and item[0] > time.monotonic():
+                self._map.move_to_end(key)
+                self.hits += 1
+                return item[1]
+
+            if item:
+                del self._map[key]
+            self.misses += 1
+
+    def put(self, key, val):
+        with self._lck:
+            self._map[key] = (time.monotonic() + self.ttl, val)
+            self._map.move_to_end(key)
+            while len(self._map) > self.size:
+                self._map.popitem(last=False)
+
+    def drop(self, *paths):
+        paths = [p for p in paths if p]
+        with self._lck:
+            for key in [k for k in self._map if any(_related(k[1], p) for p in paths)]:
+                del self._map[key]
+
+    def clear(self):
+        with self._lck:
+            self._map.clear()
@@ -0,0 +1,52 @@
+import errno
+import json
+import logging
+import os
+import threading
+
+LOG = logging.getLogger()
+
+class Checkpoint(object):
+    def __init__(self, name, **info):
+        self.name = name
+        self.info = info
+        self.done = []
+        self.local = None
+        self.seen = False
+        self._lck = threading.Lock()
+
+        try:
+            with open(self.name) as f:
+                bits = json.load(f)
+
+            if all(bits.get(k) == v for k, v in self.info.items()):
+                self.done = [tuple(i) for i in bits.get('done', [])]
+                self.local = bits.get('local')
+                self.seen = True
+                LOG.debug('%s: resuming from checkpoint', self.name)
+            else:
+                LOG.debug('%s: stale checkpoint, starting over', self.name)
+        except ValueError:
+            LOG.debug('%s: failed to parse checkpoint', self.name)
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise e
+
+    def save(self):
+        temp = '%s.tmp' % self.name
+        with self._lck:
+            with open(temp, 'w') as f:
+                json.dump(dict(self.info, done=self.done, local=self.local), f)
+            os.replace(temp, self.name)
+
+    def mark(self, offset, length):
+        with self._lck:
+            self.done.append((offset, length))
+        self.save()
+
+    def clear(self):
+        try:
+            os.unlink(self.name)
+        except EnvironmentError as e:
+            if e.errno != errno.ENOENT:
+                raise e
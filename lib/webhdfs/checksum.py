@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import re
+import struct
+import threading
+import zlib
+
+try:
+    from crc32c import crc32c as _crc32c
+except ImportError:
+    _crc32c = None
+
+LOG = logging.getLogger()
+
+_slow = _crc32c is None
+
+_TABLE = []
+for i in range(256):
+    c = i
+    for j in range(8):
+        c = (c >> 1) ^ 0x82f63b78 if c & 1 else c >> 1
+    _TABLE.append(c)
+
+def crc32c(data, crc=0):
+    if _crc32c:
+        return _crc32c(data, crc)
+
+    t = _TABLE
+    crc ^= 0xffffffff
+    for b in data:
+        crc = t[(crc ^ b) & 0xff] ^ (crc >> 8)
+    return crc ^ 0xffffffff
+
+def parse(bits):
+    m = re.match(r'MD5-of-(\d+)MD5-of-(\d+)(CRC32C?)$', bits.get('algorithm', ''))
+    if not m or len(bits.get('bytes', '')) != 56:
+        return None
+
+    return int(bits['bytes'][:8], 16) or 512, m.group(3), bits['bytes'][24:]
+
+class CRCs(object):
+    def __init__(self, bpc=512, kind='CRC32C'):
+        self.bpc = bpc
+        self.kind = kind
+        self.func = crc32c if kind == 'CRC32C' else zlib.crc32
+        self.part = bytearray()
+        self.out = bytearray()
+
+        global _slow
+        if kind == 'CRC32C' and _slow:
+            _slow = False
+            LOG.warning('crc32c module not installed, checksum verification uses a slow pure python fallback')
+
+    def update(self, data):
+        data = memoryview(data).cast('B')
+        if self.part:
+            n = self.bpc - len(self.part)
+            self.part += data[:n]
+            data = data[n:]
+            if len(self.part) < self.bpc:
+                return
+            self.out += struct.pack('>I', self.func(self.part))
+            self.part = bytearray()
+
+        n = len(data) - len(data) % self.bpc
+        if n:
+            self.out += struct.pack('>%dI' % (n // self.bpc), *[self.func(data[i:i + self.bpc]) for i in range(0, n, self.bpc)])
+        self.part += data[n:]
+
+    def close(self):
+        if self.part:
+            self.out += struct.pack('>I', self.func(self.part))
+            self.part = bytearray()
+
+        return self.out
+
+class Checksum(object):
+    def __init__(self, block, bpc=512, kind='CRC32C'):
+        self.bpc = bpc
+        self.kind = kind
+        self.size = max(block // bpc, 1) * 4
+        self.crcs = CRCs(bpc, kind)
+        self.outer = hashlib.md5()
+        self.inner = hashlib.md5()
+        self.fill = 0
+        self.next = 0
+        self.pend = {}
+        self._lck = threading.Lock()
+
+    def _fold(self, crcs):
+        crcs = memoryview(crcs)
+        while crcs:
+            n = min(self.size - self.fill, len(crcs))
+            self.inner.update(crcs[:n])
+            self.fill += n
+            crcs = crcs[n:]
+            if self.fill == self.size:
+                self.outer.update(self.inner.digest())
+                self.inner = hashlib.md5()
+                self.fill = 0
+
+    def update(self, data):
+        self.crcs.update(data)
+        self._fold(self.crcs.out)
+        self.crcs.out = bytearray()
+
+    def add(self, offset, crcs):
+        with self._lck:
+            self.pend[offset] = crcs
+            while self.next in self.pend:
+                c = self.pend.pop(self.next)
+                self._fold(c)
+                self.next += len(c) // 4 * self.bpc
+
+    def hexdigest(self):
+        with self._lck:
+            tail = self.crcs.part
+            inner = self.inner.copy()
+            outer = self.outer.copy()
+            if tail:
+                inner.update(struct.pack('>I', self.crcs.func(tail)))
+            if tail or self.fill:
+                outer.update(inner.digest())
+
+            return outer.hexdigest()
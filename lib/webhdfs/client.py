@@ -5,27 +5,203 @@ import fnmatch
 import functools
 import logging
 import os
-import requests
-import tempfile
+import stat
+import threading
+import time
 import urllib.parse
-import xml.etree.cElementTree as ET
 
+from .attrib import WebHDFSListing
 from .attrib import WebHDFSObject
+from .cache import Cache
+from .checkpoint import Checkpoint
+from .checksum import CRCs
+from .checksum import Checksum
+from .checksum import parse as _parse_checksum
+from .codec import decode as _decode
+from .ha import HAState
+from .ha import load_conf
+from .ha import save_conf
+from .metrics import Metrics
+from .reader import WebHDFSReader
+from .writer import WebHDFSWriter
 from .errors import WebHDFSError
+from .errors import WebHDFSAlreadyBeingCreatedError
+from .errors import WebHDFSChecksumError
 from .errors import WebHDFSConnectionError
+from .errors import WebHDFSFileAlreadyExistsError
 from .errors import WebHDFSFileNotFoundError
 from .errors import WebHDFSIllegalArgumentError
 from .errors import WebHDFSIncompleteTransferError
+from .errors import WebHDFSRecoveryInProgressError
+from .errors import WebHDFSUnsupportedOperationError
 
 LOG = logging.getLogger()
 
+_CONFS = {}
+
+du = collections.namedtuple('du', ['dirs', 'files', 'hdfs_usage', 'disk_usage', 'hdfs_quota', 'disk_quota'])
+xfer = collections.namedtuple('xfer', ['files', 'size', 'time', 'errors'])
+block = collections.namedtuple('block', ['offset', 'length', 'hosts', 'racks'])
+
+def _summary(r, real=False):
+    d = du(r['directoryCount'], r['fileCount'], r['length'], r['spaceConsumed'], r['quota'], r['spaceQuota'])
+    if isinstance(real, str):
+        try:
+            return getattr(d, real)
+        except AttributeError:
+            raise WebHDFSIllegalArgumentError('\'%s\' is an invalid summary attribute' % real)
+    elif isinstance(real, bool):
+        return d.hdfs_usage if not real else d.disk_usage
+    else:
+        return d
+
+def _magic(name):
+    return any(c in name for c in '*?[')
+
+def _braces(pat):
+    d = 0
+    for i, c in enumerate(pat):
+        if c == '{':
+            if not d:
+                a, l = i, []
+            d += 1
+        elif c == ',' and d == 1:
+            l.append(i)
+        elif c == '}' and d:
+            d -= 1
+            if not d and l:
+                l = [a] + l + [i]
+                return [r for j in range(len(l) - 1) for r in _braces(pat[:a] + pat[l[j] + 1:l[j + 1]] + pat[i + 1:])]
+            elif not d:
+                return [pat[:i + 1] + r for r in _braces(pat[i + 1:])]
+
+    return [pat]
+
+class _RangeWriter(object):
+    def __init__(self, fd, offset, crcs=None):
+        self.fd = fd
+        self.offset = offset
+        self.crcs = crcs
+
+    def write(self, bits):
+        bits = memoryview(bits)
+        if self.crcs:
+            self.crcs.update(bits)
+        while bits:
+            n = os.pwrite(self.fd, bits, self.offset)
+            self.offset += n
+            bits = bits[n:]
+
+class _Tee(object):
+    def __init__(self, data, crcs):
+        self.data = data
+        self.crcs = crcs
+
+    def write(self, bits):
+        self.crcs.update(bits)
+        return self.data.write(bits)
+
+    def tell(self):
+        return self.data.tell()
+
+class _Chunks(object):
+    def __init__(self, data, size=64 * 1024, crcs=None):
+        self.data = data
+        self.size = size
+        self.sent = 0
+        self.crcs = crcs
+
+    @property
+    def length(self):
+        if isinstance(self.data, (bytes, bytearray, memoryview)):
+            return memoryview(self.data).nbytes
+        try:
+            s = os.fstat(self.data.fileno())
+            if stat.S_ISREG(s.st_mode):
+                return s.st_size - self.data.tell()
+        except (AttributeError, OSError, ValueError):
+            pass
+
+        return None
+
+    def _iter(self):
+        data = self.data
+        if isinstance(data, str):
+            data = bytes(data, 'utf8')
+
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            data = memoryview(data).cast('B')
+            for i in range(0, len(data), self.size):
+                yield data[i:i + self.size]
+        elif hasattr(data, 'read') or hasattr(data, 'recv'):
+            read = getattr(data, 'read', None) or getattr(data, 'recv')
+            while True:
+                c = read(self.size)
+                if not c:
+                    break
+                yield c
+        else:
+            for c in data:
+                yield c
+
+    def __iter__(self):
+        for c in self._iter():
+            if isinstance(c, str):
+                c = bytes(c, 'utf8')
+            if self.crcs:
+                self.crcs.update(c)
+            self.sent += len(c)
+            yield c
+
+class _Closed(Exception):
+    pass
+
+class _Pipe(object):
+    def __init__(self, depth=64):
+        import queue
+
+        self.q = queue.Queue(depth)
+        self.size = 0
+        self.done = False
+
+    def put(self, item):
+        import queue
+
+        while not self.done:
+            try:
+                return self.q.put(item, timeout=0.1)
+            except queue.Full:
+                pass
+
+        raise _Closed()
+
+    def write(self, bits):
+        self.put(bytes(bits))
+        self.size += len(bits)
+
+    def tell(self):
+        return self.size
+
+def _tally(data, info):
+    for c in data:
+        info['sent'] += len(c)
+        yield c
+
 class WebHDFSClient(object):
-    def __init__(self, base, user, conf=None, wait=None):
+    def __init__(self, base, user, conf=None, wait=None, retry=None, batch=True, cache=0, ttl=5, pool=None, expect=1048576):
         self.user = user
         self.wait = wait or 0.5
-        self.http = requests.Session()
+        self.retry = 3 if retry is None else retry
+        self.batch = batch
+        self.cache = Cache(cache, ttl) if cache else None
+        self.pool = pool or {}
+        self.expect = expect
+        self._http = None
+        self.metrics = Metrics()
         self._cnt = 0
+        self._lck = threading.Lock()
         self._cfg(base, conf)
+        self._ha = HAState(','.join(sorted(self.urls))) if len(self.urls) > 1 else None
 
 
     def _url(self, url):
@@ -36,6 +212,30 @@ class WebHDFSClient(object):
 
     def _cfg(self, base, conf=None):
         url = urllib.parse.urlparse(base)
+        keys = [base]
+
+        for part in ('hdfs', 'core'):
+            item = '%s/%s-site.xml' % (os.environ.get('HADOOP_CONF_DIR', conf), part)
+            try:
+                info = os.stat(item)
+                keys.append('%s:%d:%d' % (item, info.st_mtime_ns, info.st_size))
+            except EnvironmentError:
+                pass
+
+        key = '|'.join(keys)
+        self.urls = list(_CONFS.get(key) or (load_conf(key) if len(keys) > 1 else None) or [])
+        if self.urls:
+            LOG.debug('using cached namenodes for %s: %s', url.hostname, ', '.join(self.urls))
+            return
+
+        self._parse(url, conf)
+        _CONFS[key] = list(self.urls)
+        if len(keys) > 1:
+            save_conf(key, self.urls)
+
+    def _parse(self, url, conf=None):
+        import xml.etree.ElementTree as ET
+
         self.urls = []
 
         for part in ('hdfs', 'core'):
@@ -70,55 +270,173 @@ class WebHDFSClient(object):
         else:
             self.urls.append(self._url(url))
 
-    def _req(self, name, path, kind='get', data=None, **args):
+    def _req(self, name, path, kind='get', data=None, host=None, **args):
+        import requests
+
         args['op']        = name
         args['user.name'] = self.user
 
+        if self._ha:
+            self._elect()
+
+        urls = sorted(self.urls, key=self._ha.is_down) if self._ha else list(self.urls)
         try:
-            for indx, base in enumerate(self.urls):
-                u = '%s/webhdfs/v1/%s' % (base, requests.compat.quote(path.lstrip('/')))
+            for base in urls:
+                u = '%s/webhdfs/v1/%s' % (base, urllib.parse.quote(path.lstrip('/')))
+                info = {'url': base, 'code': 0, 'sent': 0, 'recv': 0, 'redirect': 0.0, 'error': None}
+                t = self.metrics.start(name, path, info)
                 try:
                     if not data:
                         r = getattr(self.http, kind)(u, params=args, timeout=self.wait)
                         self._log(r)
                         self._cnt += 1
+                        info['code'] = r.status_code
+                        info['recv'] = len(r.content)
                         r.raise_for_status()
                         return r.json() if len(r.content) else ''
-                    elif kind == 'put':
-                        r = self.http.put(u, params=args, allow_redirects=False, timeout=self.wait)
+                    elif kind in ('put', 'post'):
+                        r = getattr(self.http, kind)(u, params=dict(args, noredirect='true'), allow_redirects=False, timeout=self.wait)
                         self._log(r)
                         self._cnt += 1
+                        info['code'] = r.status_code
+                        info['redirect'] = r.elapsed.total_seconds()
                         r.raise_for_status()
-                        r = self.http.put(r.headers['location'], headers={'content-type': 'application/octet-stream'}, data=data)
+                        l = r.headers['location'] if r.is_redirect else r.json()['Location']
+                        try:
+                            if self.expect is not None and l.startswith('http:') and (data.length is None or data.length > self.expect):
+                                from .pool import expect
+                                r = expect(self.http, kind, l, _tally(data, info), self.wait)
+                            else:
+                                r = getattr(self.http, kind)(l, headers={'content-type': 'application/octet-stream'}, data=_tally(data, info))
+                        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                            info['error'] = type(e).__name__
+                            raise WebHDFSIncompleteTransferError('%s: transfer interrupted: %s' % (path, e))
                         self._log(r)
                         self._cnt += 1
+                        info['code'] = r.status_code
                         r.raise_for_status()
                         return True
+                    elif host:
+                        r = self.http.get(u, params=dict(args, noredirect='true'), allow_redirects=False, timeout=self.wait)
+                        self._log(r)
+                        self._cnt += 1
+                        info['code'] = r.status_code
+                        info['redirect'] = r.elapsed.total_seconds()
+                        r.raise_for_status()
+                        l = urllib.parse.urlsplit(r.headers['location'] if r.is_redirect else r.json()['Location'])
+                        l = l._replace(netloc='%s:%d' % (host, l.port or 80)).geturl()
+                        try:
+                            r = self.http.get(l, stream=True, timeout=self.wait)
+                        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                            info['error'] = type(e).__name__
+                            raise WebHDFSIncompleteTransferError('%s: %s: transfer interrupted: %s' % (path, host, e))
+                        self._log(r)
+                        self._cnt += 1
+                        info['code'] = r.status_code
+                        r.raise_for_status()
                     else:
                         r = self.http.get(u, params=args, stream=True, timeout=self.wait)
                         self._log(r)
                         self._cnt += 1
+                        info['code'] = r.status_code
+                        info['redirect'] = sum(h.elapsed.total_seconds() for h in r.history)
                         r.raise_for_status()
+                    try:
                         for c in r.iter_content(16 * 1024):
+                            info['recv'] += len(c)
                             data.write(c)
-                        return True
+                    except requests.exceptions.RequestException as e:
+                        info['error'] = type(e).__name__
+                        raise WebHDFSIncompleteTransferError('%s: transfer interrupted: %s' % (path, e))
+                    return True
                 except requests.exceptions.HTTPError as e:
                     try:
-                        if e.response.json()['RemoteException']['exception'] == 'StandbyException':
+                        info['error'] = e.response.json()['RemoteException']['exception']
+                        if info['error'] == 'StandbyException':
+                            self.metrics.bump('standby', 'failovers')
+                            self._fail(base)
                             continue
                         raise WebHDFSError(e.response.json())
                     except ValueError:
+                        info['error'] = e.response.reason
                         raise WebHDFSError('%s: %s' % (e.response.reason, path))
-                except requests.exceptions.ConnectionError:
-                    continue
-                except requests.exceptions.Timeout:
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    info['error'] = type(e).__name__
+                    if e.request is None or urllib.parse.urlparse(e.request.url).netloc == urllib.parse.urlparse(base).netloc:
+                        self._fail(base)
+                    self.metrics.bump('failovers')
                     continue
+                finally:
+                    self.metrics.done(name, path, t, info)
             else:
                 raise WebHDFSConnectionError('cannot connect to any webhdfs endpoint')
         finally:
-            self.urls = self.urls[indx:] + self.urls[:indx]
+            with self._lck:
+                if base in self.urls:
+                    indx = self.urls.index(base)
+                    self.urls = self.urls[indx:] + self.urls[:indx]
+
+            if self._ha and base != self._ha.active and not self._ha.is_down(base):
+                self._ha.save(base)
+
+            if self.cache and kind != 'get':
+                self.cache.drop(path, args.get('destination'), *args.get('sources', '').split(','))
+
+    def _fail(self, base):
+        if self._ha:
+            LOG.debug('%s: marking namenode down for %d seconds', base, self._ha.hold)
+            self._ha.mark(base)
+
+    def _probe(self, base):
+        import requests
+
+        info = {'url': base, 'code': 0, 'error': None}
+        t = self.metrics.start('PROBE', '/', info)
+        try:
+            r = self.http.get('%s/webhdfs/v1/' % base, params={'op': 'GETFILESTATUS', 'user.name': self.user}, timeout=self.wait)
+            self._log(r)
+            self._cnt += 1
+            info['code'] = r.status_code
+            if r.ok:
+                return True
+            info['error'] = r.reason
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            info['error'] = type(e).__name__
+        finally:
+            self.metrics.done('PROBE', '/', t, info)
+
+        self._fail(base)
+        return False
+
+    def _elect(self):
+        import concurrent.futures
+
+        with self._lck:
+            if self._ha.seen:
+                return
+
+            active = self._ha.load()
+            if active not in self.urls:
+                pool = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.urls))
+                jobs = dict((pool.submit(self._probe, u), u) for u in self.urls)
+                for j in concurrent.futures.as_completed(jobs):
+                    if j.result():
+                        active = jobs[j]
+                        break
+                pool.shutdown(wait=False)
+
+                if active:
+                    self._ha.save(active)
+
+            if active:
+                LOG.debug('using active namenode %s', active)
+                indx = self.urls.index(active)
+                self.urls = self.urls[indx:] + self.urls[:indx]
 
     def _log(self, rsp):
+        if not LOG.isEnabledFor(logging.DEBUG):
+            return
+
         LOG.debug('url:  %s', rsp.url)
         LOG.debug('code: %d %s', rsp.status_code, rsp.reason)
 
@@ -139,46 +457,257 @@ class WebHDFSClient(object):
 
         return '/'+'/'.join(rval)
 
+    @property
+    def http(self):
+        if self._http is None:
+            import requests
+            from .pool import PoolAdapter
+
+            http = requests.Session()
+            http.mount('http://', PoolAdapter(self.metrics, **self.pool))
+            http.mount('https://', PoolAdapter(self.metrics, **self.pool))
+            self._http = http
+
+        return self._http
+
     @property
     def calls(self):
         return self._cnt
 
+    @property
+    def hits(self):
+        return self.cache.hits if self.cache else 0
+
+    @property
+    def misses(self):
+        return self.cache.misses if self.cache else 0
+
+    def _list(self, path):
+        if not self.cache:
+            for i in self._page(path):
+                yield i
+            return
+
+        l = self.cache.get(('ls', path))
+        if l is None:
+            l = []
+            for i in self._page(path):
+                l.append(dict(i))
+                yield i
+            self.cache.put(('ls', path), l)
+        else:
+            for i in l:
+                yield dict(i)
+
+    def _page(self, path):
+        last = ''
+        while self.batch:
+            try:
+                r = self._req('LISTSTATUS_BATCH', path, startAfter=last)['DirectoryListing']
+            except (WebHDFSIllegalArgumentError, WebHDFSUnsupportedOperationError) as e:
+                if last:
+                    raise e
+                LOG.debug('%s: batched listing unsupported, falling back: %s', path, e)
+                self.batch = False
+                break
+
+            l = r['partialListing']['FileStatuses']['FileStatus']
+            for i in l:
+                yield i
+
+            if not l or not r['remainingEntries']:
+                return
+            last = l[-1]['pathSuffix']
+
+        for i in self._req('LISTSTATUS', path)['FileStatuses']['FileStatus']:
+            yield i
+
     def stat(self, path, catch=False):
+        p = self._fix(path)
         try:
-            r = self._req('GETFILESTATUS', path)
-            return WebHDFSObject(path, r['FileStatus'])
+            r = self.cache.get(('stat', p)) if self.cache else None
+            if r is None:
+                r = self._req('GETFILESTATUS', p)['FileStatus']
+                if self.cache:
+                    self.cache.put(('stat', p), dict(r))
+            return WebHDFSObject(path, dict(r))
         except WebHDFSFileNotFoundError as e:
             if not catch:
                 raise e
 
         return False
 
+    def _fresh(self, path, catch=False):
+        if self.cache:
+            self.cache.drop(self._fix(path))
+        return self.stat(path, catch)
+
     def ls(self, path, recurse=False, request=False):
         p = self._fix(path)
-        r = self._req('LISTSTATUS', p)
-        for i in r['FileStatuses']['FileStatus']:
+        if recurse:
+            skip = lambda o: callable(request) and not request(o)
+            for o in self.walk(p, prune=skip, ordered=True):
+                if not skip(o):
+                    yield o
+            return
+
+        for i in self._list(p):
             o = WebHDFSObject(p, i)
             if not callable(request) or request(o):
                 yield o
-                if recurse and o.is_dir():
-                    for o in self.ls('%s/%s' % (p, o.name), recurse, request):
-                        yield o
 
-    def glob(self, path):
-        l = ['']
+    def listing(self, path, recurse=False, workers=8):
+        def scan(p):
+            l = [(p, i) for i in self._list(p)]
+            return l, ['%s/%s' % (p.rstrip('/'), i['pathSuffix']) for p, i in l if recurse and i['pathSuffix'] and i['type'] == 'DIRECTORY']
+
+        return WebHDFSListing(self._fanout(scan, [self._fix(path)], workers))
+
+    def walk(self, path, depth=None, prune=None, workers=8, ordered=False, group=False):
+        import concurrent.futures
+        import queue
+
         p = self._fix(path)
-        c = p.lstrip('/').split('/')
-        for i, n in enumerate(c):
-            d = []
-            for t in l:
-                r = self._req('LISTSTATUS', t)
-                for f in r['FileStatuses']['FileStatus']:
-                    if fnmatch.fnmatch(f['pathSuffix'], n):
-                        if i == len(c) - 1:
-                            d.append(WebHDFSObject(t, f))
-                        elif f['type'] == 'DIRECTORY':
-                            d.append('%s/%s' % (t, f['pathSuffix']))
-            l = d
+        q = queue.Queue()
+        n = [0]
+        stop = threading.Event()
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+        def scan(p, level):
+            if stop.is_set():
+                return p, [], {}
+
+            l = [WebHDFSObject(p, i) for i in self._list(p)]
+            k = {}
+            for o in l:
+                if stop.is_set():
+                    break
+                if o.is_dir() and (depth is None or level < depth) and not (callable(prune) and prune(o)):
+                    k[o.name] = submit(o.full, level + 1)
+            return p, l, k
+
+        def submit(p, level):
+            with self._lck:
+                n[0] += 1
+            f = pool.submit(scan, p, level)
+            if not ordered:
+                f.add_done_callback(q.put)
+            return f
+
+        try:
+            r = submit(p, 1)
+
+            if not ordered:
+                while n[0]:
+                    p, l, k = q.get().result()
+                    with self._lck:
+                        n[0] -= 1
+                    if group:
+                        yield p, l
+                    else:
+                        for o in l:
+                            yield o
+            elif group:
+                s = [r]
+                while s:
+                    p, l, k = s.pop().result()
+                    yield p, l
+                    s.extend(k[o.name] for o in reversed(l) if o.name in k)
+            else:
+                p, l, k = r.result()
+                s = [(iter(l), k)]
+                while s:
+                    o = next(s[-1][0], None)
+                    if o is None:
+                        s.pop()
+                        continue
+                    yield o
+                    if o.name in s[-1][1]:
+                        p, l, k = s[-1][1][o.name].result()
+                        s.append((iter(l), k))
+        finally:
+            stop.set()
+            pool.shutdown(wait=True)
+
+    def _fanout(self, func, seed, workers=8):
+        import concurrent.futures
+        import queue
+
+        q = queue.Queue()
+        n = [0]
+        stop = threading.Event()
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+        def run(item):
+            if stop.is_set():
+                return [], []
+            return func(item)
+
+        def submit(item):
+            n[0] += 1
+            pool.submit(run, item).add_done_callback(q.put)
+
+        try:
+            for i in seed:
+                submit(i)
+
+            while n[0]:
+                r, k = q.get().result()
+                n[0] -= 1
+                for i in k:
+                    submit(i)
+                for o in r:
+                    yield o
+        finally:
+            stop.set()
+            pool.shutdown(wait=True)
+
+    def _glob(self, item):
+        p, c, i = item
+        while i < len(c) - 1 and not _magic(c[i]):
+            p, i = '%s/%s' % (p, c[i]), i + 1
+
+        n = c[i]
+        if not _magic(n):
+            o = self.stat('%s/%s' % (p, n), catch=True)
+            return [o] if o else [], []
+
+        try:
+            l = [WebHDFSObject(p, f) for f in self._list(p) if f['pathSuffix'] and (n == '**' or fnmatch.fnmatchcase(f['pathSuffix'], n))]
+        except WebHDFSFileNotFoundError:
+            return [], []
+
+        k = []
+        if n == '**':
+            k = [(o.full, c, i) for o in l if o.is_dir()]
+            if i == len(c) - 1:
+                return l, k
+            i, n = i + 1, c[i + 1]
+            l = [o for o in l if fnmatch.fnmatchcase(o.name, n)]
+
+        if i == len(c) - 1:
+            return l, k
+        return [], k + [(o.full, c, i + 1) for o in l if o.is_dir()]
+
+    def iglob(self, path, workers=8):
+        seed = []
+        for pat in _braces(path):
+            c = [i for i in self._fix(pat).split('/') if i]
+            c = [i for j, i in enumerate(c) if i != '**' or not j or c[j - 1] != '**']
+            if c:
+                seed.append(('', c, 0))
+            else:
+                yield self.stat('/')
+
+        seen = set()
+        for o in self._fanout(self._glob, seed, workers):
+            if o.full not in seen:
+                seen.add(o.full)
+                yield o
+
+    def glob(self, path, workers=8):
+        p = self._fix(path)
+        l = sorted(self.iglob(path, workers), key=lambda o: o.full)
 
         if not l:
             raise WebHDFSFileNotFoundError('%s: no matching file or directory' % p)
@@ -188,19 +717,73 @@ class WebHDFSClient(object):
     def du(self, path, real=False):
         p = self._fix(path)
         r = self._req('GETCONTENTSUMMARY', p)['ContentSummary']
+        return _summary(r, real)
 
-        n = collections.namedtuple('du', ['dirs', 'files', 'hdfs_usage', 'disk_usage', 'hdfs_quota', 'disk_quota'])
-        d = n(r['directoryCount'], r['fileCount'], r['length'], r['spaceConsumed'], r['quota'], r['spaceQuota'])
-        if isinstance(real, str):
+    def usage(self, path, depth=1, workers=8, sort='hdfs_usage'):
+        if sort not in du._fields:
+            raise WebHDFSIllegalArgumentError('\'%s\' is an invalid summary attribute' % sort)
+
+        def scan(item):
+            p, level = item
             try:
-                return getattr(d, real)
-            except AttributeError:
-                raise WebHDFSIllegalArgumentError('\'%s\' is an invalid summary attribute' % real)
-        elif isinstance(real, bool):
-            return d.hdfs_usage if not real else d.disk_usage
-        else:
-            return d
+                d = _summary(self._req('GETCONTENTSUMMARY', p)['ContentSummary'], None)
+                if level >= depth or not d.dirs:
+                    return [(p, d)], []
+                return [(p, d)], [(o.full, level + 1) for o in (WebHDFSObject(p, i) for i in self._list(p)) if o.is_dir()]
+            except WebHDFSFileNotFoundError:
+                if level:
+                    return [], []
+                raise
 
+        return sorted(self._fanout(scan, [(self._fix(path), 0)], workers), key=lambda i: (-getattr(i[1], sort), i[0]))
+
+
+    def blocks(self, path):
+        p = self._fix(path)
+        try:
+            r = self._req('GETFILEBLOCKLOCATIONS', p)['BlockLocations']['BlockLocation']
+            return [block(b['offset'], b['length'], b['hosts'], [t.rsplit('/', 1)[0] for t in b['topologyPaths']]) for b in r]
+        except (WebHDFSUnsupportedOperationError, WebHDFSIllegalArgumentError) as e:
+            LOG.debug('%s: falling back to GET_BLOCK_LOCATIONS: %s', p, e)
+
+        r = self._req('GET_BLOCK_LOCATIONS', p)['LocatedBlocks']['locatedBlocks']
+        return [block(b['startOffset'], b['block']['numBytes'], [l['hostName'] for l in b['locations']], [l['networkLocation'] for l in b['locations']]) for b in r]
+
+    def _plan(self, path, size, chunk, locate=False):
+        if not locate:
+            return [(o, min(chunk, size - o), None) for o in range(0, size, chunk)]
+
+        import socket
+
+        try:
+            blks = self.blocks(path)
+        except (WebHDFSUnsupportedOperationError, WebHDFSIllegalArgumentError) as e:
+            LOG.debug('%s: block locations not available: %s', path, e)
+            return self._plan(path, size, chunk)
+
+        me = set([socket.gethostname(), socket.getfqdn()])
+        try:
+            me.update(socket.gethostbyname_ex(socket.gethostname())[2])
+        except OSError:
+            pass
+
+        load = collections.Counter()
+        plan = []
+        for b in blks:
+            for o in range(b.offset, b.offset + b.length, chunk):
+                reps = sorted(zip(b.hosts, b.racks), key=lambda h: (h[0] not in me, h[1] != locate, load[h[0]]))
+                hosts = [h for h, r in reps]
+                if hosts:
+                    load[hosts[0]] += 1
+                plan.append((o, min(chunk, b.offset + b.length - o), hosts, load[hosts[0]] if hosts else 0))
+
+        LOG.debug('%s: planned %d ranges over %d datanodes', path, len(plan), len(load))
+        return [i[:3] for i in sorted(plan, key=lambda i: (i[3], i[0]))]
+
+    def checksum(self, path):
+        p = self._fix(path)
+        r = self._req('GETFILECHECKSUM', p)['FileChecksum']
+        return r
 
     def mkdir(self, path):
         p = self._fix(path)
@@ -213,9 +796,9 @@ class WebHDFSClient(object):
         r = self._req('RENAME', p, 'put', destination=d)
         return r['boolean']
 
-    def rm(self, path):
+    def rm(self, path, recurse=False):
         p = self._fix(path)
-        r = self._req('DELETE', p, 'delete')
+        r = self._req('DELETE', p, 'delete', recursive='true' if recurse else 'false')
         return r['boolean']
 
     def repl(self, path, num):
@@ -233,8 +816,7 @@ class WebHDFSClient(object):
         r = self._req('SETPERMISSION', p, 'put', permission='%o' % perm if isinstance(perm, int) else perm)
         return True
 
-    def touch(self, path, time=None):
-        p = self._fix(path)
+    def _mtime(self, time=None):
         d = datetime.datetime.now()
         if isinstance(time, datetime.datetime):
             d = time
@@ -242,23 +824,582 @@ class WebHDFSClient(object):
             d = datetime.datetime.fromtimestamp(time)
         elif time is not None:
             raise WebHDFSIllegalArgumentError('\'%s\' is an invalid time argument' % time)
+        return d.strftime('%s000')
+
+    def touch(self, path, time=None):
+        p = self._fix(path)
+        t = self._mtime(time)
         if not self.stat(p, True):
             self.put(p, '')
-        r = self._req('SETTIMES', p, 'put', modificationtime=d.strftime('%s000'))
+        r = self._req('SETTIMES', p, 'put', modificationtime=t)
         return True
 
-    def get(self, path, data=None):
+    def bulk(self, name, paths, *args, recurse=False, workers=8):
+        import concurrent.futures
+
+        if name not in ('chmod', 'chown', 'repl', 'rm', 'touch'):
+            raise WebHDFSIllegalArgumentError('%s: unsupported bulk operation' % name)
+
+        func = kids = lambda p: getattr(self, name)(p, *args)
+        if name == 'rm':
+            func = functools.partial(self.rm, recurse=recurse)
+            recurse = False
+        elif name == 'touch':
+            t = self._mtime(*args)
+            func = lambda p: self.touch(p, *args)
+
+            def kids(p):
+                self._req('SETTIMES', p, 'put', modificationtime=t)
+                return True
+
+        def call(item):
+            f, p, e = item
+            try:
+                return p, e or f(p)
+            except WebHDFSError as e:
+                return p, e
+
+        def roots():
+            if isinstance(paths, str):
+                n = 0
+                for o in self.iglob(paths, workers):
+                    n += 1
+                    yield o.full, o.is_dir()
+                if not n:
+                    yield self._fix(paths), WebHDFSFileNotFoundError('%s: no matching file or directory' % self._fix(paths))
+            else:
+                for p in paths:
+                    yield self._fix(p), None
+
+        dirs = {}
+        def items():
+            for p, d in roots():
+                if isinstance(d, WebHDFSError):
+                    yield None, p, d
+                    continue
+                if not recurse:
+                    yield func, p, None
+                    continue
+                if d is None:
+                    try:
+                        d = self.stat(p).is_dir()
+                    except WebHDFSError as e:
+                        yield None, p, e
+                        continue
+                if not d:
+                    yield func, p, None
+                    continue
+
+                if name != 'repl':
+                    dirs.setdefault(p.count('/'), []).append((func, p, None))
+                try:
+                    for o in self.walk(p, workers=workers):
+                        if not o.is_dir():
+                            yield kids, o.full, None
+                        elif name != 'repl':
+                            dirs.setdefault(o.full.count('/'), []).append((kids, o.full, None))
+                except WebHDFSError as e:
+                    yield None, p, e
+
+        busy = set()
+        def run(seq):
+            for i in seq:
+                busy.add(pool.submit(call, i))
+                if len(busy) >= workers * 4:
+                    done, rest = concurrent.futures.wait(busy, return_when=concurrent.futures.FIRST_COMPLETED)
+                    busy.difference_update(done)
+                    for f in done:
+                        yield f.result()
+            for f in concurrent.futures.as_completed(list(busy)):
+                busy.discard(f)
+                yield f.result()
+
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        try:
+            for r in run(items()):
+                yield r
+            for k in sorted(dirs, reverse=True):
+                for r in run(dirs[k]):
+                    yield r
+        finally:
+            for f in busy:
+                f.cancel()
+            pool.shutdown(wait=True)
+
+    def upload(self, path, dest, workers=8, include=None, exclude=None):
+        import concurrent.futures
+
+        include = [include] if isinstance(include, str) else include or []
+        exclude = [exclude] if isinstance(exclude, str) else exclude or []
+        match = lambda r, l: any(fnmatch.fnmatch(r, i) for i in l)
+
+        t = time.monotonic()
+        s = os.path.abspath(path)
+        d = self._fix(dest)
+        dirs = set([d])
+        jobs = []
+        for root, subs, names in os.walk(s):
+            r = os.path.relpath(root, s).replace(os.sep, '/')
+            r = '' if r == '.' else r + '/'
+            subs[:] = [i for i in subs if not match(r + i, exclude)]
+            if not include:
+                dirs.add(self._fix('%s/%s' % (d, r)))
+            for n in names:
+                f = os.path.join(root, n)
+                try:
+                    i = os.stat(f)
+                except OSError:
+                    continue
+                if stat.S_ISREG(i.st_mode) and (not include or match(r + n, include)) and not match(r + n, exclude):
+                    dirs.add(self._fix('%s/%s' % (d, r)))
+                    jobs.append((i.st_size, f, '%s/%s%s' % (d, r, n)))
+
+        def send(job):
+            try:
+                with open(job[1], 'rb') as f:
+                    self.put(job[2], f)
+                return job, None
+            except (WebHDFSError, OSError) as e:
+                return job, e
+
+        def make(p):
+            try:
+                self.mkdir(p)
+                return p, None
+            except WebHDFSError as e:
+                return p, e
+
+        errs = []
+        done = [0, 0]
+        dirs = sorted(dirs, key=lambda p: p.split('/'))
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        busy = []
+        try:
+            busy = [pool.submit(make, p) for i, p in enumerate(dirs) if i + 1 == len(dirs) or not dirs[i + 1].startswith(p.rstrip('/') + '/')]
+            for f in busy:
+                p, e = f.result()
+                if e:
+                    errs.append((p, e))
+
+            busy = [pool.submit(send, j) for j in sorted(jobs, reverse=True)]
+            for f in busy:
+                job, e = f.result()
+                if e:
+                    errs.append((job[2], e))
+                else:
+                    done[0] += 1
+                    done[1] += job[0]
+        finally:
+            for f in busy:
+                f.cancel()
+            pool.shutdown(wait=True)
+
+        LOG.debug('%s: uploaded %d files, %d bytes', d, done[0], done[1])
+        return xfer(done[0], done[1], time.monotonic() - t, errs)
+
+    def sync(self, path, dest, workers=8, delete=False, include=None, exclude=None, checksum=False):
+        import concurrent.futures
+
+        include = [include] if isinstance(include, str) else include or []
+        exclude = [exclude] if isinstance(exclude, str) else exclude or []
+        match = lambda r, l: any(fnmatch.fnmatch(r, i) for i in l)
+
+        t = time.monotonic()
+        p = self._fix(path)
+        d = os.path.abspath(dest)
+        n = len(p.rstrip('/')) + 1
+        keep = set([''])
+        jobs = []
+        errs = []
+        skip = 0
+
+        try:
+            for o in self.walk(p, workers=workers, prune=lambda o: match(o.full[n:], exclude)):
+                r = o.full[n:]
+                f = os.path.join(d, *r.split('/'))
+                if o.is_dir():
+                    if not include:
+                        keep.add(r)
+                        try:
+                            os.makedirs(f, exist_ok=True)
+                        except OSError as e:
+                            errs.append((f, e))
+                            delete = False
+                    continue
+                if include and not match(r, include) or match(r, exclude):
+                    continue
+
+                keep.add(r)
+                for i in range(r.count('/')):
+                    keep.add(r.rsplit('/', i + 1)[0])
+                same = False
+                try:
+                    s = os.stat(f)
+                    if s.st_size == o.size and s.st_mtime_ns // 1000000 == o.time:
+                        skip += 1
+                        continue
+                    same = checksum and s.st_size == o.size
+                except OSError:
+                    pass
+                jobs.append((o.size, o.full, f, o.time, same, o.bits.get('blockSize', 0)))
+        except (WebHDFSError, OSError) as e:
+            errs.append((p, e))
+            delete = False
+
+        def fetch(job):
+            size, src, dst, when, same, block = job
+            temp = os.path.join(os.path.dirname(dst), '.%s.webhdfs' % os.path.basename(dst))
+            try:
+                if same:
+                    s, want = self._sums(src, block)
+                    with open(dst, 'rb') as f:
+                        if s and self._rehash(s, f, 0, size).hexdigest() == want:
+                            os.utime(dst, ns=(when * 1000000, when * 1000000))
+                            return job, False
+
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                self.get(src, data=open(temp, 'wb'), verify=checksum)
+                os.utime(temp, ns=(when * 1000000, when * 1000000))
+                os.replace(temp, dst)
+                return job, None
+            except (WebHDFSError, OSError) as e:
+                try:
+                    os.unlink(temp)
+                except OSError:
+                    pass
+                return job, e
+
+        done = [0, 0]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            for job, e in pool.map(fetch, sorted(jobs, reverse=True)):
+                if e is False:
+                    skip += 1
+                elif e:
+                    errs.append((job[1], e))
+                    delete = False
+                else:
+                    done[0] += 1
+                    done[1] += job[0]
+
+        gone = 0
+        if delete:
+            for root, subs, names in os.walk(d, topdown=False):
+                r = os.path.relpath(root, d).replace(os.sep, '/')
+                r = '' if r == '.' else r + '/'
+                for i in names + subs:
+                    if r + i not in keep and not any(match((r + i).rsplit('/', k)[0], exclude) for k in range(r.count('/') + 1)):
+                        try:
+                            if i in subs:
+                                os.rmdir(os.path.join(root, i))
+                            else:
+                                os.unlink(os.path.join(root, i))
+                            gone += 1
+                        except OSError as e:
+                            errs.append((os.path.join(root, i), e))
+
+        LOG.debug('%s: fetched %d files, %d bytes, %d unchanged, %d deleted', p, done[0], done[1], skip, gone)
+        return xfer(done[0], done[1], time.monotonic() - t, errs)
+
+    def _checkpoint(self, data, resume, **info):
+        if not resume:
+            return None
+
+        name = resume if isinstance(resume, str) else getattr(data, 'name', None)
+        if not isinstance(name, str):
+            raise WebHDFSIllegalArgumentError('cannot resume transfer without a named local file')
+
+        return Checkpoint(name if isinstance(resume, str) else '%s.webhdfs' % name, **info)
+
+    def _backoff(self, path, tries, e):
+        LOG.debug('%s: attempt %d failed, retrying: %s', path, tries + 1, e)
+        time.sleep(self.wait * (tries + 1))
+
+    def _get_range(self, path, data, offset, length, ckpt=None, sums=None, hosts=None):
+        w = _RangeWriter(data.fileno(), offset, CRCs(sums.bpc, sums.kind) if sums else None)
+        hosts = (hosts or []) + [None]
+        for i in range(self.retry + 1):
+            try:
+                self._req('OPEN', path, 'get', data=w, host=hosts[i % len(hosts)], offset=w.offset, length=offset + length - w.offset)
+                break
+            except (WebHDFSIncompleteTransferError, WebHDFSConnectionError) as e:
+                if i == self.retry:
+                    raise e
+                self._backoff(path, i, e)
+
+        if sums:
+            sums.add(offset, w.crcs.close())
+        if ckpt:
+            ckpt.mark(offset, length)
+
+    def _prealloc(self, path, data, size, ckpt=None):
+        import fcntl
+
+        if fcntl.fcntl(data.fileno(), fcntl.F_GETFL) & os.O_APPEND:
+            raise WebHDFSIllegalArgumentError('%s: cannot write ranges to a file open for append' % path)
+
+        data.flush()
+        f = os.fstat(data.fileno())
+        done = set()
+        if ckpt and ckpt.done:
+            if ckpt.local == [f.st_dev, f.st_ino, size] and f.st_size == size:
+                done = set(ckpt.done)
+            else:
+                LOG.debug('%s: local file changed, discarding checkpoint', ckpt.name)
+                ckpt.done = []
+
+        os.ftruncate(data.fileno(), size)
+        if ckpt:
+            ckpt.local = [f.st_dev, f.st_ino, size]
+            ckpt.save()
+
+        return done
+
+    def _get_ranges(self, path, data, size, workers, plan, ckpt=None, sums=None):
+        import concurrent.futures
+
+        done = self._prealloc(path, data, size, ckpt)
+        if sums:
+            for o, n in done:
+                sums.add(o, self._rehash(CRCs(sums.bpc, sums.kind), data, o, n).close())
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            jobs = [pool.submit(self._get_range, path, data, o, n, ckpt, sums, h) for o, n, h in plan if (o, n) not in done]
+            LOG.debug('%s: fetching %d ranges with %d workers', path, len(jobs), workers)
+
+            try:
+                for j in concurrent.futures.as_completed(jobs):
+                    j.result()
+            except Exception as e:
+                for j in jobs:
+                    j.cancel()
+                raise e
+
+    def _get_stream(self, path, data, base, offset=0, length=None):
+        for i in range(self.retry + 1):
+            try:
+                n = data.tell() - base
+                self._req('OPEN', path, 'get', data=data, offset=offset + n, length=None if length is None else length - n)
+                break
+            except (WebHDFSIncompleteTransferError, WebHDFSConnectionError) as e:
+                if i == self.retry:
+                    raise e
+                self._backoff(path, i, e)
+
+    def _sums(self, path, block, crcs=None):
+        try:
+            bpc, kind, want = _parse_checksum(self.checksum(path)) or (None, None, None)
+        except (WebHDFSUnsupportedOperationError, WebHDFSIllegalArgumentError) as e:
+            LOG.debug('%s: checksum not available: %s', path, e)
+            return None, None
+
+        if not want or crcs and (crcs.bpc, crcs.kind) != (bpc, kind):
+            LOG.debug('%s: cannot verify checksum algorithm', path)
+            return None, None
+
+        return Checksum(block, bpc, kind), want
+
+    def _rehash(self, crcs, data, offset, length):
+        with open(data.name, 'rb') as f:
+            f.seek(offset)
+            while length > 0:
+                b = f.read(min(length, 1024 * 1024))
+                if not b:
+                    break
+                crcs.update(b)
+                length -= len(b)
+
+        return crcs
+
+    def _reseed(self, crcs, data, base, size):
+        n = size - size % crcs.bpc
+        if len(crcs.out) // 4 * crcs.bpc < n:
+            crcs.out = bytearray()
+            n = 0
+        crcs.out = crcs.out[:n // crcs.bpc * 4]
+        crcs.part = bytearray()
+
+        d = self._rewind(data, base, n)
+        while d is not None and n < size:
+            b = d[:min(size - n, 1024 * 1024)] if isinstance(d, memoryview) else d.read(min(size - n, 1024 * 1024))
+            if not b:
+                break
+            crcs.update(b)
+            n += len(b)
+            d = d[len(b):] if isinstance(d, memoryview) else d
+
+    def _read(self, path, offset, length):
+        import io
+
+        b = io.BytesIO()
+        self._get_stream(path, b, 0, offset, length)
+        return b.getvalue()
+
+    def _pump(self, path, depth, offset=0, length=None):
+        pipe = _Pipe(depth)
+
+        def run():
+            try:
+                self._get_stream(path, pipe, 0, offset, length)
+                pipe.put(None)
+            except _Closed:
+                pass
+            except Exception as e:
+                try:
+                    pipe.put(e)
+                except _Closed:
+                    pass
+
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            while True:
+                c = pipe.q.get()
+                if c is None:
+                    return
+                if isinstance(c, Exception):
+                    raise c
+                yield c
+        finally:
+            pipe.done = True
+
+    def stream(self, path, decode=False, depth=64, offset=0, length=None):
+        c = self._pump(self._fix(path), depth, offset, length)
+        return _decode(c) if decode else c
+
+    def head(self, path, lines=10, size=None, chunk=64 * 1024):
+        p = self._fix(path)
+        o = self._fresh(p)
+        if size is not None:
+            return self._read(p, 0, min(size, o.size))
+
+        buf = b''
+        while len(buf) < o.size and buf.count(b'\n') < lines:
+            b = self._read(p, len(buf), min(chunk, o.size - len(buf)))
+            if not b:
+                break
+            buf += b
+            chunk *= 2
+
+        n = -1
+        for i in range(lines):
+            n = buf.find(b'\n', n + 1)
+            if n < 0:
+                return buf
+
+        return buf[:n + 1]
+
+    def tail(self, path, lines=10, size=None, chunk=64 * 1024):
+        p = self._fix(path)
+        o = self._fresh(p)
+        if size is not None:
+            size = min(size, o.size)
+            return self._read(p, o.size - size, size)
+
+        buf = b''
+        end = o.size
+        while end > 0 and buf.count(b'\n', 0, len(buf) - 1) < lines:
+            n = min(chunk, end)
+            end -= n
+            buf = self._read(p, end, n) + buf
+            chunk *= 2
+
+        n = len(buf) - 1
+        for i in range(lines):
+            n = buf.rfind(b'\n', 0, n)
+            if n < 0:
+                break
+
+        return buf[n + 1:]
+
+    def open(self, path, mode='rb', buffering=-1, encoding=None, block=256 * 1024, ahead=16, cache=32, interval=None, background=False):
+        import io
+
+        if mode not in ('r', 'rb', 'w', 'wb', 'a', 'ab'):
+            raise ValueError('invalid mode: %r' % mode)
+        if not buffering and 'b' not in mode:
+            raise ValueError("can't have unbuffered text I/O")
+
+        p = self._fix(path)
+        o = self._fresh(p, catch=mode[0] != 'r')
+        if o and o.is_dir():
+            raise WebHDFSError('%s: is a directory' % p)
+
+        if mode[0] == 'r':
+            f = WebHDFSReader(self, p, o.size, block, ahead, cache)
+            if buffering:
+                f = io.BufferedReader(f, buffering if buffering > 0 else io.DEFAULT_BUFFER_SIZE)
+        else:
+            if mode[0] == 'w' or not o:
+                self._req('CREATE', p, 'put', data=_Chunks(b''), overwrite='true')
+            f = WebHDFSWriter(self, p, o.size if o and mode[0] == 'a' else 0, buffering if buffering >= 0 else 16 * 1024 * 1024, interval, background)
+
+        return io.TextIOWrapper(f, encoding, write_through=True) if 'b' not in mode else f
+
+    def _append(self, path, data, size):
+        n = 0
+        for i in range(self.retry + 1):
+            try:
+                self._req('APPEND', path, 'post', data=_Chunks(memoryview(data)[n:]))
+                break
+            except (WebHDFSIncompleteTransferError, WebHDFSConnectionError, WebHDFSAlreadyBeingCreatedError, WebHDFSRecoveryInProgressError) as e:
+                if i == self.retry:
+                    raise e
+                o = self._fresh(path, catch=True)
+                n = max(0, min(len(data), (o.size if o else size) - size))
+                if n == len(data):
+                    break
+                self._backoff(path, i, e)
+
+        LOG.debug('%s: appended %d bytes', path, len(data))
+        return size + len(data)
+
+    def get(self, path, data=None, workers=1, chunk=64 * 1024 * 1024, resume=False, verify=False, locate=False):
+        import tempfile
+
         rval = True
+        own = not data or isinstance(data, str)
         if not data:
             rval = False
             data = tempfile.TemporaryFile()
+        elif isinstance(data, str):
+            data = open(data, 'r+b' if resume and os.path.exists(data) else 'w+b')
 
-        p = self._fix(path)
-        self._req('OPEN', p, 'get', data=data)
+        try:
+            p = self._fix(path)
+            o = self._fresh(p)
+            k = self._checkpoint(data, resume, path=p, size=o.size, date=o.time)
+            s, want = self._sums(p, o.bits.get('blockSize', 0)) if verify else (None, None)
+            if k and not k.seen:
+                data.seek(0)
+                data.truncate()
+            if k:
+                k.save()
 
-        data.flush()
-        if os.fstat(data.fileno()).st_size != self.stat(p).size:
-            raise WebHDFSIncompleteTransferError('%s: download incomplete' % p)
+            if workers > 1 and (o.size > chunk or locate):
+                if s:
+                    chunk += -chunk % s.bpc
+                self._get_ranges(p, data, o.size, workers, self._plan(p, o.size, chunk, locate), k, s)
+            else:
+                base = data.tell()
+                if k:
+                    base = 0
+                    data.seek(0, os.SEEK_END)
+                if s and k and data.tell():
+                    data.flush()
+                    self._rehash(s, data, 0, data.tell())
+                self._get_stream(p, _Tee(data, s) if s else data, base)
+
+            data.flush()
+            if os.fstat(data.fileno()).st_size != o.size:
+                raise WebHDFSIncompleteTransferError('%s: download incomplete' % p)
+            if s and s.hexdigest() != want:
+                raise WebHDFSChecksumError('%s: download checksum mismatch' % p)
+        except Exception as e:
+            if own:
+                data.close()
+            raise e
+
+        if k:
+            k.clear()
 
         if not rval:
             data.seek(0)
@@ -267,24 +1408,172 @@ class WebHDFSClient(object):
         data.close()
         return rval
 
-    def put(self, path, data):
+    def _rewind(self, data, base, offset):
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return memoryview(data).cast('B')[offset:]
+        if hasattr(data, 'seekable') and data.seekable():
+            data.seek(base + offset)
+            return data
+
+        return None
+
+    def _parts(self, data, chunk):
+        n = _Chunks(data).length
+        if n is not None:
+            import mmap
+
+            m = memoryview(data).cast('B') if isinstance(data, (bytes, bytearray, memoryview)) else memoryview(mmap.mmap(data.fileno(), 0, access=mmap.ACCESS_READ))[data.tell():]
+            for o in range(0, n, chunk):
+                yield m[o:o + chunk]
+            return
+
+        b = bytearray()
+        for c in _Chunks(data, 1024 * 1024):
+            b += c
+            if len(b) >= chunk:
+                yield bytes(b[:chunk])
+                del b[:chunk]
+        if b:
+            yield bytes(b)
+
+    def _put_parts(self, path, data, workers, chunk, verify=False):
+        import concurrent.futures
+        import uuid
+
+        if self._fresh(path, catch=True):
+            raise WebHDFSFileAlreadyExistsError('%s: file already exists' % path)
+
+        tmp = self._fix('%s/.%s.%s.part' % (os.path.dirname(path), os.path.basename(path), uuid.uuid4().hex[:12]))
+        base = data.tell() if hasattr(data, 'seekable') and data.seekable() else 0
+        sem = threading.BoundedSemaphore(workers)
+        names = []
+        jobs = []
+        size = 0
+
+        self.put(tmp, b'')
+        try:
+            block = self._fresh(tmp).bits.get('blockSize', 0)
+        finally:
+            self.rm(tmp)
+        if block:
+            chunk = max(chunk - chunk % block, block)
+
+        def drop():
+            for n in names:
+                try:
+                    self.rm(n)
+                except WebHDFSError:
+                    pass
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                it = self._parts(data, chunk)
+                while not any(j.done() and j.exception() for j in jobs):
+                    sem.acquire()
+                    c = next(it, None)
+                    if c is None:
+                        sem.release()
+                        break
+                    names.append('%s%d' % (tmp, len(names)))
+                    size += len(c)
+                    jobs.append(pool.submit(self.put, names[-1], c, False, verify))
+                    jobs[-1].add_done_callback(lambda j: sem.release())
+                LOG.debug('%s: uploading %d parts with %d workers', path, len(jobs), workers)
+
+                try:
+                    for j in jobs:
+                        j.result()
+                except Exception as e:
+                    for j in jobs:
+                        j.cancel()
+                    raise e
+
+            if not names:
+                return self.put(path, b'')
+            if len(names) > 1:
+                try:
+                    self._req('CONCAT', names[0], 'post', sources=','.join(names[1:]))
+                except (WebHDFSUnsupportedOperationError, WebHDFSIllegalArgumentError) as e:
+                    d = self._rewind(data, base, 0)
+                    if d is None:
+                        raise e
+                    LOG.debug('%s: concat not available, uploading as a single stream: %s', path, e)
+                    drop()
+                    return self.put(path, d, verify=verify)
+            if not self.mv(names[0], path):
+                raise WebHDFSError('%s: cannot rename %s into place' % (path, names[0]))
+        except Exception as e:
+            drop()
+            raise e
+
+        if self._fresh(path).size != size:
+            raise WebHDFSIncompleteTransferError('%s: upload incomplete' % path)
+
+        if hasattr(data, 'read'):
+            data.close()
+        return True
+
+    def put(self, path, data, resume=False, verify=False, workers=1, chunk=256 * 1024 * 1024):
         if isinstance(data, str):
             data = bytes(data, 'utf8')
 
-        if isinstance(data, bytes):
-            temp = tempfile.TemporaryFile()
+        p = self._fix(path)
+        n = _Chunks(data).length if workers > 1 and not resume else 0
+        if n is None or n > chunk:
+            return self._put_parts(p, data, workers, chunk, verify)
 
-            temp.write(data)
-            temp.flush()
-            temp.seek(0)
+        o = False
+        b = data.tell() if hasattr(data, 'seekable') and data.seekable() else 0
+        d = data
 
-            LOG.debug('%s: saved %d bytes to temp file', temp.name, len(data))
-            data = temp
+        k = None
+        s = CRCs() if verify else None
+        if resume:
+            if not hasattr(data, 'fileno'):
+                raise WebHDFSIllegalArgumentError('cannot resume transfer without a named local file')
+            f = os.fstat(data.fileno())
+            k = self._checkpoint(data, resume, path=p, size=f.st_size - b, date=int(f.st_mtime * 1000))
+            if k.seen:
+                o = self._fresh(p, catch=True)
+                if o and s:
+                    self._reseed(s, data, b, o.size)
+                d = self._rewind(data, b, o.size) if o else data
+            k.save()
 
-        p = self._fix(path)
-        self._req('CREATE', p, 'put', data=data)
-        if os.fstat(data.fileno()).st_size != self.stat(p).size:
-            raise WebHDFSIncompleteTransferError('%s: upload incomplete' % data.name)
+        for i in range(self.retry + 1):
+            c = _Chunks(d, crcs=s)
+            try:
+                if o:
+                    self._req('APPEND', p, 'post', data=c)
+                else:
+                    self._req('CREATE', p, 'put', data=c)
+                break
+            except (WebHDFSIncompleteTransferError, WebHDFSConnectionError, WebHDFSAlreadyBeingCreatedError, WebHDFSRecoveryInProgressError) as e:
+                if i == self.retry:
+                    raise e
+                o = self._fresh(p, catch=True)
+                if s:
+                    self._reseed(s, data, b, o.size if o else 0)
+                d = self._rewind(data, b, o.size if o else 0)
+                if d is None:
+                    raise e
+                self._backoff(p, i, e)
 
-        data.close()
+        n = (o.size if o else 0) + c.sent
+        f = self._fresh(p)
+        LOG.debug('%s: streamed %d bytes', p, n)
+        if n != f.size:
+            raise WebHDFSIncompleteTransferError('%s: upload incomplete' % p)
+        if s:
+            m, want = self._sums(p, f.bits.get('blockSize', 0), s)
+            if m:
+                m.add(0, s.close())
+            if m and m.hexdigest() != want:
+                raise WebHDFSChecksumError('%s: upload checksum mismatch' % p)
+
+        if k:
+            k.clear()
+
+        if hasattr(data, 'read'):
+            data.close()
         return True
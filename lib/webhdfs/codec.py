@@ -0,0 +1,79 @@
+import itertools
+
+MAGIC = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+)
+
+def detect(head):
+    for m, name in MAGIC:
+        if head.startswith(m):
+            return name
+
+    return None
+
+def _maker(name):
+    if name == 'gzip':
+        import zlib
+        return lambda: zlib.decompressobj(16 + zlib.MAX_WBITS), zlib.error
+    if name == 'bz2':
+        import bz2
+        return bz2.BZ2Decompressor, OSError
+    if name == 'xz':
+        import lzma
+        return lambda: lzma.LZMADecompressor(lzma.FORMAT_XZ), lzma.LZMAError
+
+    return None, None
+
+def _inflate(d, data, size):
+    if hasattr(d, 'unconsumed_tail'):
+        while True:
+            out = d.decompress(data, size)
+            if out:
+                yield out
+            data = d.unconsumed_tail
+            if d.eof or not data and len(out) < size:
+                return
+    else:
+        out = d.decompress(data, size)
+        while True:
+            if out:
+                yield out
+            if d.eof or d.needs_input:
+                return
+            out = d.decompress(b'', size)
+
+def decode(chunks, size=64 * 1024):
+    chunks = iter(chunks)
+
+    head = b''
+    for c in chunks:
+        head += c
+        if len(head) >= 6:
+            break
+
+    name = detect(head)
+    make, fail = _maker(name)
+    if not make:
+        if head:
+            yield head
+        for c in chunks:
+            yield c
+        return
+
+    d = make()
+    for c in itertools.chain([head], chunks):
+        while c:
+            if d.eof:
+                if not c.strip(b'\x00'):
+                    break
+                d = make()
+            try:
+                yield from _inflate(d, c, size)
+            except fail as e:
+                raise OSError('invalid %s data: %s' % (name, e))
+            c = d.unused_data if d.eof else b''
+
+    if not d.eof:
+        raise EOFError('compressed file ended before the end-of-stream marker was reached')
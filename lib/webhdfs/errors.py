@@ -19,9 +19,15 @@ class WebHDFSConnectionError(WebHDFSError):
 class WebHDFSIncompleteTransferError(WebHDFSError):
     pass
 
+class WebHDFSChecksumError(WebHDFSError):
+    pass
+
 class WebHDFSFileNotFoundError(WebHDFSError):
     pass
 
+class WebHDFSFileAlreadyExistsError(WebHDFSError):
+    pass
+
 class WebHDFSIllegalArgumentError(WebHDFSError):
     pass
 
@@ -34,5 +40,11 @@ class WebHDFSSecurityError(WebHDFSError):
 class WebHDFSUnsupportedOperationError(WebHDFSError):
     pass
 
+class WebHDFSAlreadyBeingCreatedError(WebHDFSError):
+    pass
+
+class WebHDFSRecoveryInProgressError(WebHDFSError):
+    pass
+
 class WebHDFSUnknownRemoteError(WebHDFSError):
     pass
@@ -0,0 +1,99 @@
+import errno
+import json
+import logging
+import os
+import threading
+import time
+
+LOG = logging.getLogger()
+
+_LCK = threading.Lock()
+
+def state_file():
+    if 'WEBHDFS_HA_STATE' in os.environ:
+        return os.environ['WEBHDFS_HA_STATE']
+
+    base = os.environ.get('XDG_RUNTIME_DIR')
+    if not base or not os.path.isdir(base):
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'webhdfs', 'ha.json')
+
+def read_state(name):
+    try:
+        with open(name) as f:
+            s = os.fstat(f.fileno())
+            if s.st_uid != os.getuid() or s.st_mode & 0o022:
+                LOG.debug('%s: ignoring ha state not private to this user', name)
+                return {}
+            return json.load(f)
+    except ValueError:
+        LOG.debug('%s: failed to parse ha state', name)
+    except EnvironmentError as e:
+        if e.errno != errno.ENOENT:
+            LOG.debug('%s: failed to read ha state: %s', name, e)
+
+    return {}
+
+def write_state(name, bits):
+    import tempfile
+
+    temp = None
+    try:
+        os.makedirs(os.path.dirname(name) or '.', 0o700, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=os.path.dirname(name) or '.', prefix='.%s.' % os.path.basename(name))
+        with os.fdopen(fd, 'w') as f:
+            json.dump(bits, f)
+        os.replace(temp, name)
+    except EnvironmentError as e:
+        LOG.debug('%s: failed to save ha state: %s', name, e)
+        if temp and os.path.exists(temp):
+            os.unlink(temp)
+
+def load_conf(key):
+    return read_state(state_file()).get('conf', {}).get(key)
+
+def save_conf(key, urls):
+    name = state_file()
+    with _LCK:
+        bits = read_state(name)
+        base = key.split('|')[0]
+        bits['conf'] = dict((k, v) for k, v in bits.get('conf', {}).items() if k.split('|')[0] != base)
+        bits['conf'][key] = urls
+        write_state(name, bits)
+
+class HAState(object):
+    def __init__(self, key, name=None, ttl=60, hold=30):
+        self.key = key
+        self.name = name or state_file()
+        self.ttl = ttl
+        self.hold = hold
+        self.seen = False
+        self.active = None
+        self.down = {}
+
+    def load(self):
+        self.seen = True
+
+        item = read_state(self.name).get(self.key, {})
+        if item.get('time', 0) + self.ttl > time.time():
+            self.active = item.get('active')
+            self.down = dict((k, v) for k, v in item.get('down', {}).items() if v > time.time())
+            LOG.debug('%s: loaded active namenode %s', self.name, self.active)
+
+        return self.active
+
+    def save(self, active):
+        self.active = active
+
+        with _LCK:
+            bits = read_state(self.name)
+            bits[self.key] = {'active': active, 'time': time.time(), 'down': dict((k, v) for k, v in self.down.items() if v > time.time())}
+            write_state(self.name, bits)
+        LOG.debug('%s: saved active namenode %s', self.name, active)
+
+    def mark(self, url):
+        self.down[url] = time.time() + self.hold
+
+    def is_down(self, url):
+        return self.down.get(url, 0) > time.time()
@@ -0,0 +1,114 @@
+import bisect
+import threading
+import time
+
+BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class Histogram(object):
+    __slots__ = ('count', 'errors', 'total', 'max', 'bins')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bins = [0] * (len(BOUNDS) + 1)
+
+    def add(self, secs, error=False):
+        self.count += 1
+        self.errors += 1 if error else 0
+        self.total += secs
+        self.max = max(self.max, secs)
+        self.bins[bisect.bisect_left(BOUNDS, secs)] += 1
+
+    def quantile(self, q):
+        n = q * self.count
+        seen = 0
+        for i, c in enumerate(self.bins):
+            seen += c
+            if c and seen >= n:
+                return min(BOUNDS[i], self.max) if i < len(BOUNDS) else self.max
+
+        return 0.0
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def bits(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'time': self.total,
+            'mean': self.mean,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'bins': dict(zip(BOUNDS + ('inf',), self.bins)),
+        }
+
+class Metrics(object):
+    def __init__(self):
+        self.before = []
+        self.after = []
+        self._lck = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lck:
+            self.ops = {}
+            self.sent = 0
+            self.recv = 0
+            self.redirect = 0.0
+            self.failovers = 0
+            self.standby = 0
+            self.connects = 0
+            self.reused = 0
+            self.expired = 0
+
+    def hook(self, before=None, after=None):
+        if before:
+            self.before.append(before)
+        if after:
+            self.after.append(after)
+
+    def start(self, op, path, info):
+        for f in self.before:
+            f(op, path, info)
+
+        return time.monotonic()
+
+    def done(self, op, path, start, info):
+        info['time'] = time.monotonic() - start
+
+        with self._lck:
+            if op not in self.ops:
+                self.ops[op] = Histogram()
+            self.ops[op].add(info['time'], info.get('error'))
+            self.sent += info.get('sent', 0)
+            self.recv += info.get('recv', 0)
+            self.redirect += info.get('redirect', 0.0)
+
+        for f in self.after:
+            f(op, path, info)
+
+    def bump(self, *names):
+        with self._lck:
+            for n in names:
+                setattr(self, n, getattr(self, n) + 1)
+
+    def snapshot(self):
+        with self._lck:
+            return {
+                'ops': dict((k, v.bits) for k, v in self.ops.items()),
+                'sent': self.sent,
+                'recv': self.recv,
+                'redirect': self.redirect,
+                'failovers': self.failovers,
+                'standby': self.standby,
+                'connects': self.connects,
+                'reused': self.reused,
+                'expired': self.expired,
+            }
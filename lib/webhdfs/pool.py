@@ -0,0 +1,107 @@
+import http.client
+import selectors
+import socket
+import time
+import urllib.parse
+
+import requests
+import requests.adapters
+import urllib3.connectionpool
+
+class _Reuse(object):
+    metrics = None
+    idle = None
+
+    def _get_conn(self, timeout=None):
+        conn = super()._get_conn(timeout)
+
+        if conn.sock is not None and self.idle and time.monotonic() - getattr(conn, '_webhdfs_idle', 0) > self.idle:
+            conn.close()
+            self.metrics.bump('expired')
+
+        self.metrics.bump('reused' if conn.sock is not None else 'connects')
+        return conn
+
+    def _put_conn(self, conn):
+        if conn:
+            conn._webhdfs_idle = time.monotonic()
+
+        super()._put_conn(conn)
+
+class PoolAdapter(requests.adapters.HTTPAdapter):
+    def __init__(self, metrics, size=16, hosts=64, idle=30, nodelay=True, sndbuf=None, rcvbuf=None):
+        self.metrics = metrics
+        self.idle = idle
+        self.opts = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+
+        if nodelay:
+            self.opts.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+        if sndbuf:
+            self.opts.append((socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf))
+        if rcvbuf:
+            self.opts.append((socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf))
+
+        super().__init__(pool_connections=hosts, pool_maxsize=size)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **kw):
+        kw['socket_options'] = self.opts
+        super().init_poolmanager(connections, maxsize, block, **kw)
+
+        bits = {'metrics': self.metrics, 'idle': self.idle}
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': type('HTTPConnectionPool', (_Reuse, urllib3.connectionpool.HTTPConnectionPool), bits),
+            'https': type('HTTPSConnectionPool', (_Reuse, urllib3.connectionpool.HTTPSConnectionPool), bits),
+        }
+
+def expect(session, kind, url, data, wait):
+    pool = session.get_adapter(url).poolmanager.connection_from_url(url)
+    conn = pool._get_conn()
+    part = urllib.parse.urlsplit(url)
+
+    try:
+        conn.putrequest(kind.upper(), '%s?%s' % (part.path, part.query) if part.query else part.path, skip_accept_encoding=True)
+        conn.putheader('Content-Type', 'application/octet-stream')
+        conn.putheader('Transfer-Encoding', 'chunked')
+        conn.putheader('Expect', '100-continue')
+        conn.endheaders()
+
+        done = False
+        with selectors.DefaultSelector() as sel:
+            sel.register(conn.sock, selectors.EVENT_READ)
+            ready = sel.select(wait)
+        if ready:
+            head = conn.sock.recv(12, socket.MSG_PEEK | socket.MSG_WAITALL)
+            if not head:
+                raise ConnectionError('connection closed before response')
+            if head[9:12] == b'100':
+                sock = conn.sock.makefile('rb', buffering=0)
+                while sock.readline() not in (b'\r\n', b'\n', b''):
+                    pass
+            else:
+                done = True
+
+        if not done:
+            for c in data:
+                if c:
+                    conn.sock.sendall(('%x\r\n' % len(c)).encode())
+                    conn.sock.sendall(c)
+                    conn.sock.sendall(b'\r\n')
+            conn.sock.sendall(b'0\r\n\r\n')
+
+        r = http.client.HTTPConnection.getresponse(conn)
+        rsp = requests.models.Response()
+        rsp.url = url
+        rsp.status_code = r.status
+        rsp.reason = r.reason
+        rsp.headers = requests.structures.CaseInsensitiveDict(r.getheaders())
+        rsp.encoding = requests.utils.get_encoding_from_headers(rsp.headers)
+        rsp._content = r.read()
+
+        if done:
+            conn.close()
+        return rsp
+    except (OSError, http.client.HTTPException) as e:
+        conn.close()
+        raise requests.exceptions.ConnectionError(e)
+    finally:
+        pool._put_conn(conn)
@@ -2,7 +2,6 @@ import atexit
 import cmd
 import getpass
 import grp
-import inspect
 import os
 import pwd
 import re
@@ -12,7 +11,6 @@ import stat
 import sys
 import textwrap
 import urllib.parse
-import zlib
 
 
 from .attrib import LocalFSObject
@@ -28,7 +26,18 @@ class WebHDFSPrompt(cmd.Cmd):
 
         self.base = urllib.parse.urlparse(base)
         self.user = getpass.getuser()
-        self.hdfs = WebHDFSClient(self.base._replace(path='').geturl(), self.user, conf, wait)
+
+        try:
+            self.jobs = max(1, int(os.environ.get('WEBHDFS_WORKERS', 8)))
+        except ValueError:
+            self.jobs = 1
+
+        try:
+            size = max(0, int(os.environ.get('WEBHDFS_CACHE', 0)))
+        except ValueError:
+            size = 0
+
+        self.hdfs = WebHDFSClient(self.base._replace(path='').geturl(), self.user, conf, wait, cache=size, pool={'size': max(16, self.jobs)})
 
         self.do_cd(path or self.base.path)
 
@@ -112,6 +121,7 @@ class WebHDFSPrompt(cmd.Cmd):
         return '/'+'/'.join(rval)
 
     def _print_usage(self):
+        import inspect
         print(getattr(self, inspect.stack()[1][3]).__doc__.strip().split('\n')[0])
 
     def _reset_prompt(self):
@@ -189,7 +199,9 @@ class WebHDFSPrompt(cmd.Cmd):
 
         # Extract completion magic from method documentation
         docs = getattr(getattr(self, 'do_'+args[0], object), '__doc__')
-        rule = re.findall(r'(?:[<\[](.+?)[>\]])+', docs)[len(args) - 2]
+        opts = set(re.findall(r'(-[-\w]+) <', docs))
+        args = args[:1] + [i for n, i in enumerate(args[1:-1]) if not i.startswith('-') and args[n] not in opts] + args[-1:]
+        rule = [i for i in re.findall(r'(?:[<\[](.+?)[>\]])+', re.sub(r'\[-[^\]]*\]', '', docs)) if not i.startswith('-')][len(args) - 2]
 
         if re.search(r'(?:local|remote) (?:file/dir|file|dir)', rule):
             kind, dest = rule.split()
@@ -254,10 +266,11 @@ class WebHDFSPrompt(cmd.Cmd):
         '''
         try:
             path = self._fix_path(path)
-            print(path + ':')
-            for name in self._list_dir(self.hdfs.ls(path)):
-                print()
-                self.do_lsr('%s/%s' % (path, name))
+            for indx, (name, objs) in enumerate(self.hdfs.walk(path, workers=self.jobs, ordered=True, group=True)):
+                if indx:
+                    print()
+                print(name + ':')
+                self._list_dir(objs)
         except WebHDFSError as e:
             print(e)
 
@@ -293,21 +306,51 @@ class WebHDFSPrompt(cmd.Cmd):
         except OSError as e:
             print(e)
 
+    def _usage(self, rows, quota=False):
+        columns = ['hdfs_usage', 'disk_usage', 'dirs', 'files'] + (['hdfs_quota', 'names', 'disk_quota', 'space'] if quota else []) + ['path']
+        table = [columns]
+        for path, d in rows:
+            item = d._asdict()
+            item['path'] = path
+            item['names'] = '%.1f%%' % (100.0 * (d.dirs + d.files) / d.hdfs_quota) if d.hdfs_quota > 0 else '-'
+            item['space'] = '%.1f%%' % (100.0 * d.disk_usage / d.disk_quota) if d.disk_quota > 0 else '-'
+            item['hdfs_quota'] = d.hdfs_quota if d.hdfs_quota >= 0 else '-'
+            item['disk_quota'] = d.disk_quota if d.disk_quota >= 0 else '-'
+            table.append([str(item[i]) for i in columns])
+
+        lengths = [max(len(r[i]) for r in table) for i in range(len(columns))]
+        for r in table:
+            print(' '.join(v.ljust(n) if c == 'path' else v.rjust(n) for c, v, n in zip(columns, r, lengths)).rstrip())
+
     def do_du(self, args=''):
         '''
-            Usage: du <remote file/dir> [du options]
+            Usage: du [-d <depth>] [-q] <remote file/dir> [du options]
 
             Options: dirs|files|hdfs_usage|disk_usage|hdfs_quota|disk_quota
 
-            Displays usage for remote file or directory
+            Displays usage for remote file or directory, or a table of usage
+            down to depth with -d, sorted by the option, and with quota
+            utilization columns with -q
         '''
         try:
             args = shlex.split(args)
+            depth = None
+            quota = False
+            while args[:1] in (['-d'], ['-q']):
+                if args[0] == '-q':
+                    quota, args = True, args[1:]
+                elif len(args) > 1 and args[1].isdigit():
+                    depth, args = int(args[1]), args[2:]
+                else:
+                    return self._print_usage()
             if len(args) > 2:
                 return self._print_usage()
 
             path = self._fix_path(args[0] if len(args) > 0 else None)
-            print(self.hdfs.du(path, args[1] if len(args) == 2 else 'hdfs_usage'))
+            if depth is None and not quota:
+                print(self.hdfs.du(path, args[1] if len(args) == 2 else 'hdfs_usage'))
+            else:
+                self._usage(self.hdfs.usage(path, depth or 0, self.jobs, args[1] if len(args) == 2 else 'hdfs_usage'), quota)
         except WebHDFSError as e:
             print(e)
 
@@ -345,14 +388,28 @@ class WebHDFSPrompt(cmd.Cmd):
         except ValueError as e:
             self._print_usage()
 
-    def do_rm(self, path):
+    def _bulk(self, name, path, *args):
+        for p, r in self.hdfs.bulk(name, path, *args, recurse=True, workers=self.jobs):
+            if isinstance(r, WebHDFSError):
+                print(r)
+
+    def _recurse(self, args, flag):
+        args = shlex.split(args)
+        return (True, args[1:]) if args[:1] == [flag] else (False, args)
+
+    def do_rm(self, args):
         '''
-            Usage: rm <remote file>
+            Usage: rm [-r] <remote file/dir>
 
-            Removes remote file
+            Removes remote file, or directory tree matching pattern with -r
         '''
         try:
-            path = self._fix_path(path, required='rm')
+            flag, args = self._recurse(args, '-r')
+            if len(args) != 1:
+                return self._print_usage()
+            path = self._fix_path(args[0], required='rm')
+            if flag:
+                return self._bulk('rm', path)
             if self.hdfs.stat(path).is_dir():
                 raise WebHDFSError('%s: cannot remove directory' % path)
             self.hdfs.rm(path)
@@ -378,16 +435,19 @@ class WebHDFSPrompt(cmd.Cmd):
 
     def do_chown(self, args):
         '''
-            Usage: chown <chown options> <remote file/dir>
+            Usage: chown [-R] <chown options> <remote file/dir>
 
             Options: [owner][:group]
 
-            Change ownership of remote file or directory
+            Change ownership of remote file or directory, recursively for all matching paths with -R
         '''
         try:
-            dest, path = shlex.split(args)
+            flag, args = self._recurse(args, '-R')
+            dest, path = args
             path = self._fix_path(path, required='chown')
             o, g = dest.split(':', 1) if ':' in dest else (dest, '')
+            if flag:
+                return self._bulk('chown', path, o, g)
             self.hdfs.chown(path, owner=o, group=g)
         except WebHDFSError as e:
             print(e)
@@ -396,21 +456,44 @@ class WebHDFSPrompt(cmd.Cmd):
 
     def do_chmod(self, args):
         '''
-            Usage: chmod <chmod options> <remote file/dir>
+            Usage: chmod [-R] <chmod options> <remote file/dir>
 
             Options: octal mode: 0000 - 0777
 
-            Change permission on remote file or directory
+            Change permission on remote file or directory, recursively for all matching paths with -R
         '''
         try:
-            perm, path = shlex.split(args)
+            flag, args = self._recurse(args, '-R')
+            perm, path = args
             path = self._fix_path(path, required='chmod')
+            if flag:
+                return self._bulk('chmod', path, perm)
             self.hdfs.chmod(path, perm)
         except WebHDFSError as e:
             print(e)
         except ValueError:
             self._print_usage()
 
+    def do_setrep(self, args):
+        '''
+            Usage: setrep [-R] <replication> <remote file/dir>
+
+            Change replication of remote file, recursively for all files under matching paths with -R
+        '''
+        try:
+            flag, args = self._recurse(args, '-R')
+            num, path = args
+            num = int(num)
+            path = self._fix_path(path, required='setrep')
+            if flag:
+                return self._bulk('repl', path, num)
+            if not self.hdfs.repl(path, num):
+                print('%s: cannot set replication' % path)
+        except WebHDFSError as e:
+            print(e)
+        except ValueError:
+            self._print_usage()
+
     def do_touch(self, args):
         '''
             Usage touch <remote file> [epoch time]
@@ -446,38 +529,148 @@ class WebHDFSPrompt(cmd.Cmd):
                 raise WebHDFSError('%s: cannot download directory' % path)
             if os.path.exists(os.path.basename(path)):
                 raise WebHDFSError('%s: file exists' % path)
-            self.hdfs.get(path, data=open('%s/%s' % (os.getcwd(), os.path.basename(path)), 'wb'))
+            self.hdfs.get(path, data=open('%s/%s' % (os.getcwd(), os.path.basename(path)), 'wb'), workers=self.jobs)
         except (WebHDFSError, OSError) as e:
             print(e)
 
-    def do_put(self, path):
+    def do_put(self, args):
         '''
-            Usage: put <local file>
+            Usage: put [-r] <local file/dir>
 
-            Upload local file into current remote directory
+            Upload local file, or directory tree with -r, into current remote directory
         '''
         try:
-            path = self._fix_path(path, local=True, required='put')
+            flag, args = self._recurse(args, '-r')
+            if len(args) != 1:
+                return self._print_usage()
+            path = self._fix_path(args[0], local=True, required='put')
             dest = '%s/%s' % (self.path, os.path.basename(path))
+            if flag and stat.S_ISDIR(os.stat(path).st_mode):
+                if self.hdfs.stat(dest, catch=True):
+                    raise WebHDFSError('%s: already exists' % dest)
+                r = self.hdfs.upload(path, dest, workers=self.jobs)
+                for p, e in r.errors:
+                    print(e)
+                print('%d files, %d bytes in %.1f seconds (%.1f MiB/s)' % (r.files, r.size, r.time, r.size / max(r.time, 0.001) / 1048576))
+                return
             if stat.S_ISDIR(os.stat(path).st_mode):
                 raise WebHDFSError('%s: cannot upload directory' % path)
             if self.hdfs.stat(dest, catch=True):
                 raise WebHDFSError('%s: already exists' % dest)
-            self.hdfs.put(dest, data=open(path, 'rb'))
+            self.hdfs.put(dest, data=open(path, 'rb'), workers=self.jobs)
         except (WebHDFSError, OSError) as e:
             print(e)
 
-    def do_cat(self, path):
+    def do_sync(self, args):
         '''
-            Usage: cat <remote file>
+            Usage: sync [-d] <remote dir> [local dir]
 
-            Display contents of remote file
+            Mirror remote directory into local directory, fetching only new or changed files and removing stale local files with -d
         '''
         try:
-            path = self._fix_path(path, required='cat')
-            if self.hdfs.stat(path).is_dir():
-                raise WebHDFSError('%s: cannot cat directory' % path)
-            sys.stdout.write(self.hdfs.get(path))
+            flag, args = self._recurse(args, '-d')
+            if len(args) not in (1, 2):
+                return self._print_usage()
+            path = self._fix_path(args[0], required='sync')
+            if not self.hdfs.stat(path).is_dir():
+                raise WebHDFSError('%s: not a directory' % path)
+            dest = self._fix_path(args[1] if len(args) == 2 else os.path.basename(path), local=True)
+            r = self.hdfs.sync(path, dest, workers=self.jobs, delete=flag)
+            for p, e in r.errors:
+                print(e)
+            print('%d files, %d bytes in %.1f seconds (%.1f MiB/s)' % (r.files, r.size, r.time, r.size / max(r.time, 0.001) / 1048576))
+        except (WebHDFSError, OSError) as e:
+            print(e)
+
+    def _write(self, data):
+        out = getattr(sys.stdout, 'buffer', sys.stdout)
+        try:
+            for c in [data] if isinstance(data, bytes) else data:
+                out.write(c)
+            out.flush()
+        except BrokenPipeError:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+    def _file(self, path, name):
+        path = self._fix_path(path, required=name)
+        item = self.hdfs.stat(path)
+        if item.is_dir():
+            raise WebHDFSError('%s: cannot %s directory' % (path, name))
+
+        return path, item
+
+    def _range(self, spec, size):
+        m = re.match(r'^(\d*)-(\d*)$', spec)
+        if not m or m.groups() == ('', ''):
+            raise WebHDFSError('%s: invalid range' % spec)
+        if not m.group(1):
+            n = min(int(m.group(2)), size)
+            return size - n, n
+
+        o = int(m.group(1))
+        e = min(int(m.group(2)) + 1, size) if m.group(2) else size
+        if o >= size or e <= o:
+            raise WebHDFSError('%s: range not satisfiable' % spec)
+
+        return o, e - o
+
+    def _count(self, args):
+        args = shlex.split(args)
+        flag, size = '-n', '10'
+        if args[:1] in (['-n'], ['-c']) and len(args) == 3:
+            flag, size, args = args[0], args[1], args[2:]
+        if len(args) != 1 or not size.isdigit():
+            return None
+
+        return (args[0], int(size), None) if flag == '-n' else (args[0], 0, int(size))
+
+    def do_cat(self, args):
+        '''
+            Usage: cat [--range <start>-<end>|<start>-|-<bytes>] <remote file>
+
+            Display contents of remote file, or only the inclusive byte range
+        '''
+        try:
+            args = shlex.split(args)
+            spec = None
+            if args[:1] == ['--range'] and len(args) == 3:
+                spec, args = args[1], args[2:]
+            if len(args) != 1:
+                return self._print_usage()
+
+            path, item = self._file(args[0], 'cat')
+            o, n = self._range(spec, item.size) if spec else (0, None)
+            self._write(self.hdfs.stream(path, offset=o, length=n))
+        except (WebHDFSError, OSError) as e:
+            print(e)
+
+    def do_head(self, args):
+        '''
+            Usage: head [-n <lines>|-c <bytes>] <remote file>
+
+            Display first lines, 10 by default, or bytes of remote file
+        '''
+        try:
+            args = self._count(args)
+            if not args:
+                return self._print_usage()
+            path, item = self._file(args[0], 'head')
+            self._write(self.hdfs.head(path, *args[1:]))
+        except (WebHDFSError, OSError) as e:
+            print(e)
+
+    def do_tail(self, args):
+        '''
+            Usage: tail [-n <lines>|-c <bytes>] <remote file>
+
+            Display last lines, 10 by default, or bytes of remote file
+        '''
+        try:
+            args = self._count(args)
+            if not args:
+                return self._print_usage()
+            path, item = self._file(args[0], 'tail')
+            self._write(self.hdfs.tail(path, *args[1:]))
         except (WebHDFSError, OSError) as e:
             print(e)
 
@@ -485,16 +678,42 @@ class WebHDFSPrompt(cmd.Cmd):
         '''
             Usage: zcat <remote file>
 
-            Display contents of compressed remote file
+            Display contents of gzip, bzip2 or xz compressed remote file
         '''
         try:
-            path = self._fix_path(path, required='zcat')
-            if self.hdfs.stat(path).is_dir():
-                raise WebHDFSError('%s: cannot cat directory' % path)
-            sys.stdout.write(zlib.decompress(self.hdfs.get(path), 16 + zlib.MAX_WBITS))
-        except (WebHDFSError, OSError) as e:
+            path, item = self._file(path, 'zcat')
+            self._write(self.hdfs.stream(path, decode=True))
+        except (WebHDFSError, OSError, EOFError) as e:
             print(e)
 
+    def do_stats(self, args=''):
+        '''
+            Usage: stats [reset]
+
+            Displays per-operation request counts, latencies and transfer totals
+        '''
+        args = shlex.split(args)
+        if args == ['reset']:
+            return self.hdfs.metrics.reset()
+        elif args:
+            return self._print_usage()
+
+        snap = self.hdfs.metrics.snapshot()
+        text = '{:<24} {:>8} {:>8} {:>10} {:>10} {:>10} {:>10} {:>10}'
+        print(text.format('operation', 'count', 'errors', 'mean', 'p50', 'p95', 'max', 'total'))
+        for name, item in sorted(snap['ops'].items()):
+            print(text.format(name, item['count'], item['errors'], *['%.1fms' % (item[k] * 1000) for k in ('mean', 'p50', 'p95', 'max', 'time')]))
+
+        print()
+        print('requests:   %d' % self.hdfs.calls)
+        print('received:   %d bytes' % snap['recv'])
+        print('sent:       %d bytes' % snap['sent'])
+        print('redirects:  %.1fms' % (snap['redirect'] * 1000))
+        print('failovers:  %d' % snap['failovers'])
+        print('standby:    %d' % snap['standby'])
+        print('cache:      %d hits, %d misses' % (self.hdfs.hits, self.hdfs.misses))
+        print('pool:       %d reused, %d connects, %d expired' % (snap['reused'], snap['connects'], snap['expired']))
+
     def do_EOF(self, line):
         print()
         return True
@@ -0,0 +1,93 @@
+import collections
+import io
+
+class WebHDFSReader(io.RawIOBase):
+    def __init__(self, client, path, size, block=256 * 1024, ahead=16, cache=32):
+        self.client = client
+        self.name = path
+        self.size = size
+        self.block = block
+        self.cache = max(1, cache)
+        self.ahead = max(1, min(ahead, self.cache))
+        self.blocks = collections.OrderedDict()
+        self.window = 1
+        self.next = None
+        self.pos = 0
+        self.hits = 0
+        self.misses = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += self.size
+        elif whence != io.SEEK_SET:
+            raise ValueError('invalid whence (%r)' % whence)
+        if offset < 0:
+            raise ValueError('negative seek position %d' % offset)
+
+        self.pos = offset
+        return self.pos
+
+    def _fetch(self, indx):
+        if indx == self.next:
+            self.window = min(self.window * 2, self.ahead)
+        else:
+            self.window = 1
+
+        last = min(indx + self.window, (self.size + self.block - 1) // self.block)
+        for i in range(indx + 1, last):
+            if i in self.blocks:
+                last = i
+                break
+
+        o = indx * self.block
+        data = memoryview(self.client._read(self.name, o, min(last * self.block, self.size) - o))
+        for i in range(indx, last):
+            self.blocks[i] = data[(i - indx) * self.block:(i - indx + 1) * self.block]
+        while len(self.blocks) > self.cache:
+            self.blocks.popitem(last=False)
+
+        self.next = last
+        self.misses += 1
+
+    def _get(self, indx):
+        if indx in self.blocks:
+            self.blocks.move_to_end(indx)
+            self.hits += 1
+        else:
+            self._fetch(indx)
+
+        return self.blocks[indx]
+
+    def readinto(self, b):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+
+        b = memoryview(b).cast('B')
+        n = 0
+        while n < len(b) and self.pos < self.size:
+            i, o = divmod(self.pos, self.block)
+            c = self._get(i)[o:o + len(b) - n]
+            if not c:
+                break
+            b[n:n + len(c)] = c
+            n += len(c)
+            self.pos += len(c)
+
+        return n
+
+    def close(self):
+        self.blocks.clear()
+        super().close()
@@ -0,0 +1,88 @@
+import io
+import threading
+import time
+
+class WebHDFSWriter(io.BufferedIOBase):
+    def __init__(self, client, path, size, limit=16 * 1024 * 1024, interval=None, background=False):
+        self.client = client
+        self.name = path
+        self.size = size
+        self.limit = limit
+        self.interval = interval
+        self.buf = bytearray()
+        self.last = time.monotonic()
+        self.error = None
+        self.flushes = 0
+        self._lck = threading.Lock()
+        self._out = threading.Lock()
+        self._end = threading.Event()
+        self._thr = None
+
+        if background and interval:
+            self._thr = threading.Thread(target=self._run, daemon=True)
+            self._thr.start()
+
+    def _run(self):
+        while not self._end.wait(self.interval):
+            try:
+                if self.buf and time.monotonic() - self.last >= self.interval:
+                    self.flush()
+            except Exception as e:
+                self.error = e
+                return
+
+    def _check(self):
+        if self.closed:
+            raise ValueError('I/O operation on closed file')
+        if self.error:
+            raise self.error
+
+    def writable(self):
+        return True
+
+    def tell(self):
+        return self.size + len(self.buf)
+
+    def write(self, b):
+        self._check()
+
+        with self._lck:
+            self.buf += b
+            n = len(self.buf)
+
+        if n >= self.limit or self.interval and time.monotonic() - self.last >= self.interval:
+            self.flush()
+
+        return memoryview(b).nbytes
+
+    def flush(self):
+        if self.closed:
+            return
+        if self.error:
+            raise self.error
+
+        with self._out:
+            with self._lck:
+                data, self.buf = self.buf, bytearray()
+            self.last = time.monotonic()
+            if not data:
+                return
+            try:
+                self.size = self.client._append(self.name, bytes(data), self.size)
+                self.flushes += 1
+            except Exception:
+                with self._lck:
+                    self.buf[:0] = data
+                raise
+
+    def close(self):
+        if self.closed:
+            return
+
+        try:
+            self._end.set()
+            if self._thr:
+                self._thr.join()
+            self.flush()
+        finally:
+            super().close()
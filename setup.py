@@ -13,5 +13,6 @@ if __name__ == '__main__':
         packages=['webhdfs'],
         package_dir={'webhdfs': 'lib/webhdfs'},
         license='LICENSE.txt',
-        install_requires=['requests', 'setuptools']
+        install_requires=['requests', 'setuptools'],
+        extras_require={'async': ['aiohttp'], 'crc32c': ['crc32c']}
     )